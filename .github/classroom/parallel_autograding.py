@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+并行自动评分脚本
+
+与 autograding.py 使用相同的测试和分数，但把 (提交目录, 测试文件) 作业并发运行。
+每个作业在一个新进程中运行，不同作业之间不共享任何模块状态（matplotlib 的
+rcParams、numpy 的随机数状态等）；新进程由预先导入了 numpy / matplotlib / pytest
+的 forkserver 派生，所以这些库只导入一次，派生很快。崩溃（如 os._exit 或段错误）
+或超过时限的作业只记为该提交的这一项测试失败，其余作业照常评分。
+
+每个提交目录（或 --output-dir 下的同名目录）中写入：
+    score.json          与 autograding.py 格式相同的分数
+    test_durations.json 每个测试用例的结果和耗时
+    score_summary.md    评分表
+
+用法:
+    python .github/classroom/parallel_autograding.py [提交目录 ...] [--workers N] [--timeout 秒]
+                                                     [--output-dir DIR]
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import time
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from autograding import TESTS  # noqa: E402
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+# 工作进程预先导入的模块
+WARM_MODULES = ['numpy', 'matplotlib', 'matplotlib.pyplot', 'pytest']
+
+# 失败时保留的 pytest 输出长度
+LOG_TAIL = 4000
+
+# 单个作业的默认时限（秒）
+DEFAULT_TIMEOUT = 600
+
+
+class DurationCollector:
+    """pytest 插件：记录每个测试用例的结果和耗时（setup + call + teardown）"""
+
+    def __init__(self):
+        self.cases = {}
+
+    def pytest_runtest_logreport(self, report):
+        case = self.cases.setdefault(report.nodeid, {'nodeid': report.nodeid, 'outcome': 'passed', 'duration': 0.0})
+        case['duration'] += report.duration
+        if report.failed:
+            case['outcome'] = 'failed' if report.when == 'call' else 'error'
+        elif report.skipped:
+            case['outcome'] = 'skipped'
+
+
+def _warm_up():
+    """作业进程初始化：导入常用库（已由 forkserver 预载时几乎不耗时）"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    for name in WARM_MODULES:
+        __import__(name)
+
+
+def _purge_modules(directory):
+    """从 sys.modules 中删除来自提交目录的模块"""
+    prefix = str(directory) + os.sep
+    for name, module in list(sys.modules.items()):
+        filename = getattr(module, '__file__', None)
+        if filename and os.path.abspath(filename).startswith(prefix):
+            del sys.modules[name]
+
+
+def run_test_file(submission, test_file):
+    """
+    在当前（工作）进程中运行提交目录下的一个测试文件。
+
+    参数:
+        submission: 提交目录
+        test_file: 相对于提交目录的测试文件路径
+
+    返回:
+        字典，包含 'submission', 'file', 'passed', 'exit_code', 'duration',
+        'cases'（每个用例的 nodeid / outcome / duration）和失败时的 'log'
+    """
+    import pytest
+    import matplotlib.pyplot as plt
+
+    submission = Path(submission).resolve()
+    saved_cwd, saved_path = os.getcwd(), list(sys.path)
+    collector = DurationCollector()
+    output = io.StringIO()
+    start = time.perf_counter()
+    try:
+        os.chdir(submission)
+        with redirect_stdout(output), redirect_stderr(output):
+            exit_code = int(pytest.main(['-q', '-p', 'no:cacheprovider', test_file], plugins=[collector]))
+    finally:
+        os.chdir(saved_cwd)
+        sys.path[:] = saved_path
+        _purge_modules(submission)
+        plt.close('all')
+    result = {
+        'submission': str(submission),
+        'file': test_file,
+        'passed': exit_code == 0,
+        'exit_code': exit_code,
+        'duration': time.perf_counter() - start,
+        'cases': list(collector.cases.values()),
+    }
+    if exit_code != 0:
+        result['log'] = output.getvalue()[-LOG_TAIL:]
+    return result
+
+
+def _job_main(conn, submission, test_file):
+    """作业进程入口：运行一个测试文件，并通过管道发回结果"""
+    _warm_up()
+    conn.send(run_test_file(submission, test_file))
+    conn.close()
+
+
+def _context():
+    """进程上下文；支持时使用预载了常用库的 forkserver"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(WARM_MODULES)
+    else:
+        context = multiprocessing.get_context('spawn')
+    return context
+
+
+def _failed_result(submission, test_file, exit_code, duration, log):
+    return {'submission': submission, 'file': test_file, 'passed': False, 'exit_code': exit_code,
+            'duration': duration, 'cases': [], 'log': log}
+
+
+def run_jobs(jobs, max_workers=None, timeout=DEFAULT_TIMEOUT):
+    """
+    每个 (提交目录, 测试文件) 作业在一个新进程中运行，最多 max_workers 个同时运行。
+
+    参数:
+        jobs: (提交目录, 测试文件) 列表
+        max_workers: 同时运行的进程数（None 表示 CPU 数）
+        timeout: 每个作业的时限（秒，None 表示不限）；超时的进程被终止
+
+    返回:
+        与 jobs 一一对应的结果列表（格式见 run_test_file）；崩溃或超时的作业
+        记为未通过，原因写在 'log' 中
+    """
+    context = _context()
+    max_workers = max_workers or os.cpu_count() or 1
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))[::-1]
+    running = {}
+    while pending or running:
+        while pending and len(running) < max_workers:
+            index = pending.pop()
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=_job_main, args=(writer,) + tuple(jobs[index]))
+            process.start()
+            writer.close()
+            running[index] = (process, reader, time.perf_counter())
+
+        wait_time = None
+        if timeout is not None:
+            wait_time = max(0.0, min(start for _, _, start in running.values()) + timeout - time.perf_counter())
+        # 进程退出（包括崩溃）时管道读端也会就绪
+        ready = multiprocessing.connection.wait([reader for _, reader, _ in running.values()], wait_time)
+        now = time.perf_counter()
+        for index, (process, reader, start) in list(running.items()):
+            submission, test_file = jobs[index]
+            if reader in ready:
+                try:
+                    results[index] = reader.recv()
+                except EOFError:
+                    process.join()
+                    results[index] = _failed_result(submission, test_file, process.exitcode, now - start,
+                                                    f"测试进程异常退出（退出码 {process.exitcode}）")
+            elif timeout is not None and now - start >= timeout:
+                process.kill()
+                process.join()
+                results[index] = _failed_result(submission, test_file, process.exitcode, now - start,
+                                                f"超过时限 {timeout} 秒，测试进程已被终止")
+            else:
+                continue
+            process.join()
+            reader.close()
+            del running[index]
+    return results
+
+
+def grade_submissions(submissions, tests=TESTS, max_workers=None, timeout=DEFAULT_TIMEOUT):
+    """
+    并行运行所有提交目录的所有测试文件并计算分数。
+
+    参数:
+        submissions: 提交目录列表
+        tests: 测试定义列表（格式同 autograding.TESTS）
+        max_workers: 同时运行的进程数（None 表示 CPU 数）
+        timeout: 每个测试文件的时限（秒，None 表示不限）
+
+    返回:
+        字典：提交目录 -> (score_data, durations)，score_data 的格式与
+        autograding.py 生成的 score.json 相同
+    """
+    submissions = dict.fromkeys(str(Path(s).resolve()) for s in submissions)
+    jobs = [(submission, test) for submission in submissions for test in tests]
+    results = run_jobs([(submission, test['file']) for submission, test in jobs], max_workers, timeout)
+
+    graded = {}
+    for (submission, test), result in zip(jobs, results):
+        score_data, durations = graded.setdefault(
+            submission, ({'score': 0, 'max_score': 0, 'tests': []}, {'tests': []}))
+        points = test['points'] if result['passed'] else 0
+        score_data['score'] += points
+        score_data['max_score'] += test['points']
+        score_data['tests'].append({
+            'name': test['name'],
+            'status': '通过' if result['passed'] else '失败',
+            'points': points,
+            'max_points': test['points'],
+        })
+        durations['tests'].append({'name': test['name'], **{key: result[key] for key in
+                                   ('file', 'passed', 'duration', 'cases', 'log') if key in result}})
+    return graded
+
+
+def write_reports(score_data, durations, directory):
+    """
+    写入 score.json、test_durations.json 和 score_summary.md。
+
+    参数:
+        score_data: 分数数据
+        durations: 每个测试的耗时数据
+        directory: 输出目录
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, 'score.json'), 'w') as f:
+        json.dump(score_data, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(directory, 'test_durations.json'), 'w') as f:
+        json.dump(durations, f, indent=2, ensure_ascii=False)
+    with open(os.path.join(directory, 'score_summary.md'), 'w') as f:
+        f.write(format_summary(score_data, durations))
+
+
+def format_summary(score_data, durations):
+    """生成 Markdown 评分表（含每个测试文件的耗时）"""
+    lines = ["# 自动评分结果\n", "| 测试 | 状态 | 得分 | 耗时 (s) |", "|------|------|------|------|"]
+    for result, timing in zip(score_data['tests'], durations['tests']):
+        lines.append(f"| {result['name']} | {result['status']} | {result['points']}/{result['max_points']} "
+                     f"| {timing['duration']:.2f} |")
+    lines.append(f"\n## 总分: {score_data['score']}/{score_data['max_score']}\n")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="并行运行自动评分")
+    parser.add_argument('submissions', nargs='*', default=[str(ROOT_DIR)], help="提交目录（默认为本仓库）")
+    parser.add_argument('--workers', type=int, default=None, help="同时运行的进程数")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="每个测试文件的时限（秒）")
+    parser.add_argument('--output-dir', default=None,
+                        help="报告输出目录（每个提交一个子目录；默认写入提交目录本身）")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    graded = grade_submissions(args.submissions, max_workers=args.workers, timeout=args.timeout)
+    all_passed = True
+    for submission, (score_data, durations) in graded.items():
+        directory = submission if args.output_dir is None else os.path.join(args.output_dir, Path(submission).name)
+        write_reports(score_data, durations, directory)
+        all_passed &= score_data['score'] == score_data['max_score']
+        print(f"{submission}: {score_data['score']}/{score_data['max_score']}")
+    print(f"共 {len(graded)} 个提交，用时 {time.perf_counter() - start:.1f} 秒")
+
+    # 单个提交时与 autograding.py 一样设置 GitHub Actions 输出
+    if len(graded) == 1:
+        score_data, durations = next(iter(graded.values()))
+        if 'GITHUB_STEP_SUMMARY' in os.environ:
+            with open(os.environ['GITHUB_STEP_SUMMARY'], 'w') as f:
+                f.write(format_summary(score_data, durations))
+        if 'GITHUB_OUTPUT' in os.environ:
+            with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
+                f.write(f"points={score_data['score']}\n")
+    return 0 if all_passed else 1
+
+
+if __name__ == "__main__":
+    # 通过模块名调用，使作业进程能按名称找到 _job_main
+    import parallel_autograding
+    sys.exit(parallel_autograding.main())
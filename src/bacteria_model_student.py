@@ -1,19 +1,37 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import os
 
+try:
+    from src.figure_export import FigureExporter
+    from src.instrumentation import stage, count
+except ImportError:
+    from figure_export import FigureExporter
+    from instrumentation import stage, count
+
 class BacteriaModel:
     """
     细菌模型类，用于实现 V(t) 和 W(t) 模型。
     """
-    def __init__(self, A, tau):
+    def __init__(self, A, tau, dtype=None):
         """
         初始化模型参数。
         :param A: 模型 W(t) 的幅度参数
         :param tau: 时间常数
+        :param dtype: 计算使用的浮点类型（如 np.float32；None 表示沿用输入类型）
         """
         self.A = A
         self.tau = tau
+        self.dtype = None if dtype is None else np.dtype(dtype)
+
+    def _cast(self, t):
+        """
+        按 dtype 转换时间数组和参数。
+        :param t: 时间
+        :return: 转换后的 t, A, tau
+        """
+        if self.dtype is None:
+            return t, self.A, self.tau
+        return (np.asarray(t, dtype=self.dtype), self.dtype.type(self.A), self.dtype.type(self.tau))
 
     def v_model(self, t):
         """
@@ -21,7 +39,9 @@ class BacteriaModel:
         :param t: 时间
         :return: V(t) 的值
         """
-        return 1 - np.exp(-t / self.tau)
+        with stage('bacteria.model', model='v'):
+            t, A, tau = self._cast(t)
+            return 1 - np.exp(-t / tau)
 
     def w_model(self, t):
         """
@@ -29,7 +49,157 @@ class BacteriaModel:
         :param t: 时间
         :return: W(t) 的值
         """
-        return self.A * (np.exp(-t / self.tau) - 1 + t / self.tau)
+        with stage('bacteria.model', model='w'):
+            t, A, tau = self._cast(t)
+            return A * (np.exp(-t / tau) - 1 + t / tau)
+
+    def residuals(self, t_obs, y_obs, model_type='w'):
+        """
+        只在观测时刻计算模型残差（不经过绘图用的稠密时间网格）。
+        :param t_obs: 观测时刻
+        :param y_obs: 观测值
+        :param model_type: 模型类型 ('v' 或 'w')
+        :return: 残差 model(t_obs) - y_obs
+        """
+        if model_type == 'v':
+            return self.v_model(t_obs) - y_obs
+        if model_type == 'w':
+            return self.w_model(t_obs) - y_obs
+        raise ValueError("model_type must be 'v' or 'w'")
+
+    def sse(self, t_obs, y_obs, model_type='w'):
+        """
+        计算观测时刻上的残差平方和。
+        :param t_obs: 观测时刻
+        :param y_obs: 观测值
+        :param model_type: 模型类型 ('v' 或 'w')
+        :return: 残差平方和
+        """
+        r = self.residuals(t_obs, y_obs, model_type)
+        return float(np.dot(r, r))
+
+
+class BacteriaObjective:
+    """
+    观测数据上的加权残差平方和目标函数，供优化器反复调用。
+
+    时间数组在构造时预处理为 -t，所有中间数组预先分配，
+    因此每次求值和求梯度都不再分配新数组。
+    参数向量：'v' 模型为 (tau,)，'w' 模型为 (A, tau)。
+    """
+
+    def __init__(self, t_obs, y_obs, model_type='w', weights=None):
+        """
+        :param t_obs: 观测时刻
+        :param y_obs: 观测值
+        :param model_type: 模型类型 ('v' 或 'w')
+        :param weights: 各观测点的权重（None 表示全为 1；可用 0/1 掩码做交叉验证）
+        """
+        if model_type not in ('v', 'w'):
+            raise ValueError("model_type must be 'v' or 'w'")
+        self.model_type = model_type
+        self.n_params = 1 if model_type == 'v' else 2
+        self.y = np.array(y_obs, dtype=float)
+        self.neg_t = -np.asarray(t_obs, dtype=float)
+        if self.neg_t.shape != self.y.shape:
+            raise ValueError("t_obs and y_obs must have the same shape")
+        self.weights = None if weights is None else np.array(weights, dtype=float)
+        n = self.y.size
+        self._e = np.empty(n)      # exp(-t/tau)
+        self._u = np.empty(n)      # t/tau
+        self._r = np.empty(n)      # 残差
+        self._wr = np.empty(n)     # 加权残差
+        self._tmp = np.empty(n)
+        self._grad = np.empty(self.n_params)
+        self._jac = np.empty((n, self.n_params))
+
+    def _unpack(self, params):
+        if self.model_type == 'v':
+            return 1.0, float(params[0])
+        return float(params[0]), float(params[1])
+
+    def residuals(self, params):
+        """
+        计算残差（写入内部缓冲区，下次调用时会被覆盖）。
+        :param params: 参数向量
+        :return: 残差数组
+        """
+        A, tau = self._unpack(params)
+        e, u, r = self._e, self._u, self._r
+        np.multiply(self.neg_t, 1.0 / tau, out=e)
+        np.negative(e, out=u)
+        np.exp(e, out=e)
+        if self.model_type == 'v':
+            np.subtract(1.0, e, out=r)
+        else:
+            np.add(e, u, out=r)
+            r -= 1.0
+            r *= A
+        r -= self.y
+        if self.weights is None:
+            self._wr[:] = r
+        else:
+            np.multiply(r, self.weights, out=self._wr)
+        return r
+
+    def __call__(self, params):
+        """
+        计算加权残差平方和。
+        :param params: 参数向量
+        :return: 加权残差平方和
+        """
+        r = self.residuals(params)
+        return float(np.dot(self._wr, r))
+
+    def value_and_grad(self, params):
+        """
+        同时计算目标函数值和梯度。
+        :param params: 参数向量
+        :return: (目标函数值, 梯度数组)；梯度数组为内部缓冲区
+        """
+        value = self(params)
+        A, tau = self._unpack(params)
+        e, u, tmp, wr, grad = self._e, self._u, self._tmp, self._wr, self._grad
+        # dW/dtau = A t/tau^2 (e - 1)，dV/dtau = -e t/tau^2
+        if self.model_type == 'v':
+            np.multiply(e, u, out=tmp)
+            grad[0] = -2.0 / tau * np.dot(wr, tmp)
+        else:
+            np.add(e, u, out=tmp)
+            tmp -= 1.0
+            grad[0] = 2.0 * np.dot(wr, tmp)
+            np.subtract(e, 1.0, out=tmp)
+            tmp *= u
+            grad[1] = 2.0 * A / tau * np.dot(wr, tmp)
+        return value, grad
+
+    def gradient(self, params):
+        """
+        计算目标函数的梯度。
+        :param params: 参数向量
+        :return: 梯度数组（内部缓冲区）
+        """
+        return self.value_and_grad(params)[1]
+
+    def jacobian(self, params):
+        """
+        计算残差对参数的雅可比矩阵（未加权）。
+        :param params: 参数向量
+        :return: 形状 (n_obs, n_params) 的数组（内部缓冲区）
+        """
+        self.residuals(params)
+        A, tau = self._unpack(params)
+        e, u, jac = self._e, self._u, self._jac
+        if self.model_type == 'v':
+            np.multiply(e, u, out=jac[:, 0])
+            jac[:, 0] *= -1.0 / tau
+        else:
+            np.add(e, u, out=jac[:, 0])
+            jac[:, 0] -= 1.0
+            np.subtract(e, 1.0, out=jac[:, 1])
+            jac[:, 1] *= u
+            jac[:, 1] *= A / tau
+        return jac
 
 
 def load_bacteria_data(filepath):
@@ -38,14 +208,17 @@ def load_bacteria_data(filepath):
     :param filepath: 数据文件路径
     :return: 时间数据和响应数据
     """
-    try:
-        data = np.loadtxt(filepath, delimiter=',')
-        return data[:, 0], data[:, 1]
-    except:
-        return np.loadtxt(filepath, delimiter=',', unpack=True)
+    with stage('bacteria.load', path=str(filepath)):
+        try:
+            data = np.loadtxt(filepath, delimiter=',')
+            time_data, response_data = data[:, 0], data[:, 1]
+        except:
+            time_data, response_data = np.loadtxt(filepath, delimiter=',', unpack=True)
+    count('bacteria.points', len(time_data))
+    return time_data, response_data
 
 
-def plot_models_and_data(models, t, time_data=None, response_data=None, title=None, model_type='w', save_path=None):
+def plot_models_and_data(models, t, time_data=None, response_data=None, title=None, model_type='w', save_path=None, exporter=None, canvas=None):
     """
     绘制模型曲线和实验数据。
     :param models: 模型实例列表
@@ -55,23 +228,57 @@ def plot_models_and_data(models, t, time_data=None, response_data=None, title=No
     :param title: 图表标题
     :param model_type: 模型类型 ('v' 或 'w')
     :param save_path: 图片保存路径（如果为 None，则不保存）
+    :param exporter: FigureExporter 实例（如果给出，则在后台保存且不显示图像）
+    :param canvas: SeriesCanvas 实例（如果给出，则原地更新曲线而不新建图像，
+                   其曲线数量须与 models 相同；图像随后会被再次修改，所以直接
+                   保存，不能与 exporter 同时使用）
+    :return: 使用 canvas 时返回其 figure
     """
-    plt.figure(figsize=(10, 6))
-    for model in models:
+    import matplotlib.pyplot as plt
+
+    if canvas is not None and exporter is not None:
+        raise ValueError("canvas 与 exporter 不能同时使用")
+    if canvas is not None:
         if model_type == 'v':
-            plt.plot(t, model.v_model(t), label=f'V(t): τ={model.tau}')
-        elif model_type == 'w':
-            plt.plot(t, model.w_model(t), label=f'W(t): A={model.A}, τ={model.tau}')
+            curves = [model.v_model(t) for model in models]
+            labels = [f'V(t): τ={model.tau}' for model in models]
+        else:
+            curves = [model.w_model(t) for model in models]
+            labels = [f'W(t): A={model.A}, τ={model.tau}' for model in models]
+        points = None
+        if time_data is not None and response_data is not None:
+            points = (time_data, response_data)
+        fig = canvas.update(t, curves if len(models) > 1 else curves[0],
+                            label=labels if len(models) > 1 else labels[0], title=title, points=points)
+        if save_path:
+            os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+            canvas.save(save_path, dpi=300)
+        return fig
+
+    with stage('bacteria.render'):
+        fig = plt.figure(figsize=(10, 6))
+        for model in models:
+            if model_type == 'v':
+                plt.plot(t, model.v_model(t), label=f'V(t): τ={model.tau}')
+            elif model_type == 'w':
+                plt.plot(t, model.w_model(t), label=f'W(t): A={model.A}, τ={model.tau}')
     
-    if time_data is not None and response_data is not None:
-        plt.scatter(time_data, response_data, label='Experimental Data', color='black', marker='o')
+        if time_data is not None and response_data is not None:
+            plt.scatter(time_data, response_data, label='Experimental Data', color='black', marker='o')
     
-    plt.xlabel('Time (t)')
-    plt.ylabel('Response')
-    plt.title(title)
-    plt.legend()
-    plt.grid(True)
+        plt.xlabel('Time (t)')
+        plt.ylabel('Response')
+        plt.title(title)
+        plt.legend()
+        plt.grid(True)
     
+    if exporter is not None:
+        if save_path:
+            exporter.submit(fig, save_path, dpi=300)
+        else:
+            plt.close(fig)
+        return
+
     if save_path:
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         plt.savefig(save_path, dpi=300)
@@ -82,29 +289,30 @@ def main():
     """
     主函数，整合所有任务。
     """
-    # 任务 1.1a: 绘制 W(t) 曲线 (A=1, τ=1)
-    model1 = BacteriaModel(A=1.0, tau=1.0)
-    t = np.linspace(0, 2, 100)
-    plot_models_and_data([model1], t, title='W(t) for A=1.0, τ=1.0', model_type='w', save_path='results/w_model_A1_tau1.png')
-
-    # 任务 1.1b: 绘制不同参数的 W(t) 曲线
-    model2 = BacteriaModel(A=2.0, tau=1.0)
-    model3 = BacteriaModel(A=1.0, tau=2.0)
-    plot_models_and_data([model1, model2, model3], t, title='W(t) for Different Parameters', model_type='w', save_path='results/w_model_different_params.png')
-
-    # 任务 1.2a: 加载实验数据并拟合 V(t)
-    time_data_a, response_data_a = load_bacteria_data('data/g149novickA.txt')
-    t = np.linspace(0, 10, 100)
-    model_fit_a = BacteriaModel(A=1.5, tau=1.8)
-    plot_models_and_data([model_fit_a], t, time_data_a, response_data_a, title='Model Fitting to Experimental Data (g149novickA)', model_type='v', save_path='results/v_model_fit_g149novickA.png')
-
-    # 任务 1.2b: 加载 g149novickB 数据并拟合 W(t)
-    time_data_b, response_data_b = load_bacteria_data('data/g149novickB.csv')
-    mask = time_data_b <= 10  # 仅保留时间 ≤ 10 小时的数据
-    time_data_b = time_data_b[mask]
-    response_data_b = response_data_b[mask]
-    model_fit_b = BacteriaModel(A=1.2, tau=1.5)
-    plot_models_and_data([model_fit_b], t, time_data_b, response_data_b, title='Model Fitting to Experimental Data (g149novickB, t ≤ 10)', model_type='w', save_path='results/w_model_fit_g149novickB.png')
+    with FigureExporter() as exporter:
+        # 任务 1.1a: 绘制 W(t) 曲线 (A=1, τ=1)
+        model1 = BacteriaModel(A=1.0, tau=1.0)
+        t = np.linspace(0, 2, 100)
+        plot_models_and_data([model1], t, title='W(t) for A=1.0, τ=1.0', model_type='w', save_path='results/w_model_A1_tau1.png', exporter=exporter)
+
+        # 任务 1.1b: 绘制不同参数的 W(t) 曲线
+        model2 = BacteriaModel(A=2.0, tau=1.0)
+        model3 = BacteriaModel(A=1.0, tau=2.0)
+        plot_models_and_data([model1, model2, model3], t, title='W(t) for Different Parameters', model_type='w', save_path='results/w_model_different_params.png', exporter=exporter)
+
+        # 任务 1.2a: 加载实验数据并拟合 V(t)
+        time_data_a, response_data_a = load_bacteria_data('data/g149novickA.txt')
+        t = np.linspace(0, 10, 100)
+        model_fit_a = BacteriaModel(A=1.5, tau=1.8)
+        plot_models_and_data([model_fit_a], t, time_data_a, response_data_a, title='Model Fitting to Experimental Data (g149novickA)', model_type='v', save_path='results/v_model_fit_g149novickA.png', exporter=exporter)
+
+        # 任务 1.2b: 加载 g149novickB 数据并拟合 W(t)
+        time_data_b, response_data_b = load_bacteria_data('data/g149novickB.csv')
+        mask = time_data_b <= 10  # 仅保留时间 ≤ 10 小时的数据
+        time_data_b = time_data_b[mask]
+        response_data_b = response_data_b[mask]
+        model_fit_b = BacteriaModel(A=1.2, tau=1.5)
+        plot_models_and_data([model_fit_b], t, time_data_b, response_data_b, title='Model Fitting to Experimental Data (g149novickB, t ≤ 10)', model_type='w', save_path='results/w_model_fit_g149novickB.png', exporter=exporter)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+"""
+Performance benchmark suite with regression tracking
+
+Usage:
+    python -m src.benchmark_suite run --output bench.json
+    python -m src.benchmark_suite compare baseline.json bench.json --threshold 0.2
+
+``compare`` exits with status 1 when any benchmark present in both files
+got slower than the baseline by more than the threshold.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+
+try:
+    from src import bacteria_model_student, hiv_model_student, logistic_map_student, millikan_fit_student
+    from src.map_engine import LOGISTIC, OneDMap, clear_cache
+except ImportError:
+    import bacteria_model_student, hiv_model_student, logistic_map_student, millikan_fit_student
+    from map_engine import LOGISTIC, OneDMap, clear_cache
+
+# Problem sizes per size class
+SIZES = {
+    'small': {'n': 1_000, 'n_r': 100, 'rows': 100},
+    'medium': {'n': 100_000, 'n_r': 500, 'rows': 10_000},
+    'large': {'n': 1_000_000, 'n_r': 2_000, 'rows': 200_000},
+}
+
+
+def _close(fig):
+    import matplotlib.pyplot as plt
+    plt.close(fig)
+
+
+def _write_table(directory, name, rows, delimiter):
+    rng = np.random.default_rng(0)
+    data = np.column_stack((np.sort(rng.uniform(1, 10, rows)), rng.uniform(1, 10, rows)))
+    path = os.path.join(directory, name)
+    np.savetxt(path, data, delimiter=delimiter)
+    return path
+
+
+def build_benchmarks(size, workdir):
+    """
+    Declare the benchmarks of one size class.
+
+    Parameters:
+        size: Key of SIZES
+        workdir: Directory for generated data files
+
+    Returns:
+        benchmarks: Dict mapping benchmark name to a zero-argument callable
+    """
+    p = SIZES[size]
+    n, n_r, rows = p['n'], p['n_r'], p['rows']
+    rng = np.random.default_rng(0)
+    t = np.linspace(0, 10, n)
+    x = rng.uniform(1, 10, n)
+    y = 2 * x + rng.normal(0, 0.1, n)
+    bacteria = bacteria_model_student.BacteriaModel(A=1.0, tau=2.0)
+    hiv = hiv_model_student.HIVModel(A=1000, alpha=0.5, B=500, beta=0.1)
+    millikan_path = _write_table(workdir, f'millikan_{size}.txt', rows, ' ')
+    comma_path = _write_table(workdir, f'series_{size}.csv', rows, ',')
+    # The same map without the inline float loop, as the baseline of the fast path
+    generic_logistic = OneDMap('logistic_generic', LOGISTIC.func)
+    bif = (2.5, 4.0, n_r, 1000, 100)
+    # Long transient over the period-doubling range: the analytic cycles pay off
+    bif_long = (2.5, 3.5, 10 * n_r, 10_200, 10_000)
+
+    def bifurcation_compute():
+        clear_cache()
+        LOGISTIC.bifurcation(*bif, x0=0.5)
+
+    def bifurcation_long_transient(analytic):
+        clear_cache()
+        LOGISTIC.bifurcation(*bif_long, x0=0.5, analytic=analytic)
+
+    def bifurcation_render():
+        # Points are cached after the first call, so only rendering is timed
+        fig = logistic_map_student.plot_bifurcation(*bif)
+        fig.canvas.draw()
+        _close(fig)
+
+    tag = f"[{size}]"
+    return {
+        f"iterate_logistic{tag}": lambda: logistic_map_student.iterate_logistic(3.9, 0.3, n),
+        f"iterate_logistic_generic{tag}": lambda: generic_logistic.iterate(3.9, 0.3, n),
+        f"bifurcation_compute{tag}": bifurcation_compute,
+        f"bifurcation_long_transient{tag}": lambda: bifurcation_long_transient(True),
+        f"bifurcation_long_transient_iterated{tag}": lambda: bifurcation_long_transient(False),
+        f"bifurcation_render{tag}": bifurcation_render,
+        f"calculate_parameters{tag}": lambda: millikan_fit_student.calculate_parameters(x, y),
+        f"bacteria_v_model{tag}": lambda: bacteria.v_model(t),
+        f"bacteria_w_model{tag}": lambda: bacteria.w_model(t),
+        f"hiv_viral_load{tag}": lambda: hiv.viral_load(t),
+        f"load_millikan{tag}": lambda: millikan_fit_student.load_data(millikan_path),
+        f"load_bacteria{tag}": lambda: bacteria_model_student.load_bacteria_data(comma_path),
+        f"load_hiv{tag}": lambda: hiv_model_student.load_hiv_data(comma_path),
+    }
+
+
+def run_benchmarks(sizes=('small', 'medium'), repeat=5, name_filter=None):
+    """
+    Time every benchmark.
+
+    Each benchmark is looped enough times for one sample to last at least
+    0.2 s (timeit autorange), and the sample is repeated `repeat` times.
+
+    Parameters:
+        sizes: Size classes to run
+        repeat: Number of samples per benchmark
+        name_filter: Only run benchmarks whose name contains this string
+
+    Returns:
+        report: Dict with 'meta' and 'results'; each result holds per-call
+                'min' and 'median' seconds, 'number' and 'repeat'
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            for name, func in build_benchmarks(size, workdir).items():
+                if name_filter and name_filter not in name:
+                    continue
+                func()  # warm up
+                timer = timeit.Timer(func)
+                number, _ = timer.autorange()
+                samples = np.array(timer.repeat(repeat=repeat, number=number)) / number
+                results[name] = {
+                    'min': float(samples.min()),
+                    'median': float(np.median(samples)),
+                    'number': number,
+                    'repeat': repeat,
+                }
+
+    meta = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+    return {'meta': meta, 'results': results}
+
+
+def compare(baseline, current, threshold=0.1, stat='min', allow_missing=False):
+    """
+    Compare two benchmark reports.
+
+    Parameters:
+        baseline: Baseline report dict
+        current: Current report dict
+        threshold: Allowed relative slowdown (0.1 = 10 %)
+        stat: Statistic compared ('min' or 'median')
+        allow_missing: Do not fail on baseline benchmarks absent from current
+
+    Returns:
+        rows: List of (name, baseline seconds, current seconds, ratio, status);
+              status is 'MISSING' (seconds and ratio None where absent) for
+              benchmarks only in the baseline and 'new' for those only in current
+        regressed: True if any benchmark is slower than allowed or, unless
+                   allow_missing, missing from current
+    """
+    rows = []
+    regressed = False
+    for name in sorted(set(baseline['results']) | set(current['results'])):
+        if name not in current['results']:
+            rows.append((name, baseline['results'][name][stat], None, None, 'MISSING'))
+            regressed |= not allow_missing
+            continue
+        if name not in baseline['results']:
+            rows.append((name, None, current['results'][name][stat], None, 'new'))
+            continue
+        old = baseline['results'][name][stat]
+        new = current['results'][name][stat]
+        ratio = new / old if old > 0 else float('inf')
+        if ratio > 1 + threshold:
+            status = 'SLOWER'
+            regressed = True
+        elif ratio < 1 / (1 + threshold):
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((name, old, new, ratio, status))
+    return rows, regressed
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of all four modules")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="run the benchmarks and write JSON")
+    run_parser.add_argument('--output', default='bench.json')
+    run_parser.add_argument('--sizes', default='small,medium', help="comma separated: small,medium,large")
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--filter', default=None, help="only run benchmarks containing this string")
+
+    compare_parser = sub.add_parser('compare', help="fail if current is slower than baseline")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    compare_parser.add_argument('--stat', choices=('min', 'median'), default='min')
+    compare_parser.add_argument('--allow-missing', action='store_true',
+                                help="do not fail on baseline benchmarks missing from current")
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        report = run_benchmarks(args.sizes.split(','), args.repeat, args.filter)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        for name, result in report['results'].items():
+            print(f"{name:36s} {result['min'] * 1e3:10.4f} ms")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows, regressed = compare(baseline, current, args.threshold, args.stat, args.allow_missing)
+    for name, old, new, ratio, status in rows:
+        old = '-' if old is None else f"{old * 1e3:.4f}"
+        new = '-' if new is None else f"{new * 1e3:.4f}"
+        ratio = '' if ratio is None else f"x{ratio:5.2f}"
+        print(f"{name:36s} {old:>10s} ms -> {new:>10s} ms  {ratio:6s}  {status}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Asynchronous, headless figure export
+"""
+
+import os
+import pickle
+
+try:
+    from src.instrumentation import stage, count
+except ImportError:
+    from instrumentation import stage, count
+
+
+def _save_figure(fig, path, dpi, savefig_kwargs):
+    """
+    Rasterize a figure and write it to disk (worker side).
+
+    Parameters:
+        fig: matplotlib figure object
+        path: Output file path
+        dpi: Output resolution
+        savefig_kwargs: Extra keyword arguments for savefig
+
+    Returns:
+        path: The written file path
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with stage('export.savefig', path=str(path)):
+        fig.savefig(path, dpi=dpi, **savefig_kwargs)
+    count('export.figures')
+    return path
+
+
+def _save_pickled_figure(payload, path, dpi, savefig_kwargs):
+    """
+    Unpickle a figure in a worker process and save it.
+
+    Parameters:
+        payload: Pickled matplotlib figure
+        path: Output file path
+        dpi: Output resolution
+        savefig_kwargs: Extra keyword arguments for savefig
+
+    Returns:
+        path: The written file path
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    return _save_figure(pickle.loads(payload), path, dpi, savefig_kwargs)
+
+
+class FigureExporter:
+    """
+    Hand finished figures to a background worker pool for saving.
+
+    The exporter switches matplotlib to the non-interactive Agg backend so
+    batch jobs never block on a display. Figures are detached from pyplot on
+    the calling thread, then rasterized and written by the pool while the
+    caller goes on computing the next figure.
+    """
+
+    def __init__(self, max_workers=None, mode='thread', dpi=300):
+        """
+        Create the exporter.
+
+        Parameters:
+            max_workers: Size of the worker pool (None for the executor default)
+            mode: 'thread' to render in threads, 'process' to pickle figures
+                  and render them in separate processes
+            dpi: Default output resolution
+        """
+        import matplotlib
+        from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+        if mode not in ('thread', 'process'):
+            raise ValueError("mode must be 'thread' or 'process'")
+        matplotlib.use('Agg', force=True)
+        self.mode = mode
+        self.dpi = dpi
+        if mode == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending = []
+
+    def submit(self, fig, path, dpi=None, **savefig_kwargs):
+        """
+        Queue a figure for saving.
+
+        Parameters:
+            fig: matplotlib figure object
+            path: Output file path
+            dpi: Output resolution (defaults to the exporter's dpi)
+            **savefig_kwargs: Extra keyword arguments for savefig
+
+        Returns:
+            future: concurrent.futures.Future resolving to the written path
+        """
+        import matplotlib.pyplot as plt
+
+        dpi = self.dpi if dpi is None else dpi
+        # Detach from pyplot here so worker threads never touch its global state
+        plt.close(fig)
+        if self.mode == 'thread':
+            future = self._executor.submit(_save_figure, fig, path, dpi, savefig_kwargs)
+        else:
+            payload = pickle.dumps(fig)
+            future = self._executor.submit(_save_pickled_figure, payload, path, dpi, savefig_kwargs)
+        self._pending.append(future)
+        return future
+
+    def flush(self):
+        """
+        Wait until every queued figure has been written.
+
+        Returns:
+            paths: List of written file paths, in submission order
+        """
+        pending, self._pending = self._pending, []
+        return [future.result() for future in pending]
+
+    def close(self):
+        """Flush outstanding figures and shut down the worker pool."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True)
+        return False
@@ -0,0 +1,189 @@
+"""
+Reusable figure/axes templates for plotting many series in a loop
+"""
+
+import io
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+class SeriesCanvas:
+    """
+    One figure with a fixed set of lines that are updated in place.
+
+    Building a figure, its axes and its artists costs far more than drawing
+    a line, so loops that render hundreds of curves keep one canvas, swap the
+    line data with ``set_data`` and re-save.
+    """
+
+    def __init__(self, figsize=(10, 6), xlabel='', ylabel='', fmt='b-', grid=True, legend=True,
+                 n_lines=1, points=False):
+        """
+        Create the canvas.
+
+        Parameters:
+            figsize: Figure size in inches
+            xlabel: x axis label
+            ylabel: y axis label
+            fmt: Line format string (used when n_lines is 1)
+            grid: Whether to draw a grid
+            legend: Whether to show a legend with the line labels
+            n_lines: Number of curves held by the canvas
+            points: Whether to add a marker series for experimental data
+        """
+        self.fig, self.ax = plt.subplots(figsize=figsize)
+        if n_lines == 1:
+            self.lines = self.ax.plot([], [], fmt, label=' ')
+        else:
+            self.lines = [self.ax.plot([], [], label=' ')[0] for _ in range(n_lines)]
+        self.line = self.lines[0]
+        self.points = None
+        if points:
+            (self.points,) = self.ax.plot([], [], 'ko', linestyle='none', label='Experimental Data')
+        self.ax.set_xlabel(xlabel)
+        self.ax.set_ylabel(ylabel)
+        self.ax.grid(grid)
+        self._legend = self.ax.legend() if legend else None
+
+    def update(self, x, y, label=None, title=None, points=None):
+        """
+        Replace the line data and rescale the axes.
+
+        Parameters:
+            x: x values shared by all lines
+            y: y values, or a sequence of y arrays (one per line) when the
+               canvas holds several lines
+            label: New line label, or sequence of labels (None keeps the current ones)
+            title: New axes title (None keeps the current one)
+            points: Optional (x, y) pair for the marker series
+
+        Returns:
+            fig: The canvas figure
+        """
+        if len(self.lines) == 1:
+            y = [y]
+            label = None if label is None else [label]
+        if len(y) != len(self.lines):
+            raise ValueError(f"Expected {len(self.lines)} series, got {len(y)}")
+        for line, values in zip(self.lines, y):
+            line.set_data(x, values)
+        if points is not None:
+            if self.points is None:
+                raise ValueError("Canvas was created without a marker series")
+            self.points.set_data(*points)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        if label is not None:
+            for i, (line, text) in enumerate(zip(self.lines, label)):
+                line.set_label(text)
+                if self._legend is not None:
+                    self._legend.get_texts()[i].set_text(text)
+        if title is not None:
+            self.ax.set_title(title)
+        return self.fig
+
+    def save(self, path, dpi=300, **savefig_kwargs):
+        """
+        Save the current state of the canvas.
+
+        Parameters:
+            path: Output file path or file-like object
+            dpi: Output resolution
+            **savefig_kwargs: Extra keyword arguments for savefig
+        """
+        self.fig.savefig(path, dpi=dpi, **savefig_kwargs)
+
+    def close(self):
+        """Release the figure."""
+        plt.close(self.fig)
+
+
+def plot_small_multiples(series, ncols=4, panel_size=(3, 2), fmt='b-', sharex=True, sharey=True, xlabel='', ylabel=''):
+    """
+    Plot many series as a grid of small panels in a single figure.
+
+    Parameters:
+        series: Sequence of (x, y, title) tuples
+        ncols: Number of panel columns
+        panel_size: Size of one panel in inches
+        fmt: Line format string
+        sharex: Share the x axis between panels
+        sharey: Share the y axis between panels
+        xlabel: x label for the bottom row
+        ylabel: y label for the left column
+
+    Returns:
+        fig: matplotlib figure object
+    """
+    if len(series) == 0:
+        raise ValueError("series cannot be empty")
+    ncols = min(ncols, len(series))
+    nrows = -(-len(series) // ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(panel_size[0] * ncols, panel_size[1] * nrows),
+                             sharex=sharex, sharey=sharey, squeeze=False)
+    for ax, (x, y, title) in zip(axes.flat, series):
+        ax.plot(x, y, fmt, lw=0.8)
+        ax.set_title(title, fontsize='small')
+    for ax in axes.flat[len(series):]:
+        ax.set_visible(False)
+    for ax in axes[-1]:
+        ax.set_xlabel(xlabel)
+    for ax in axes[:, 0]:
+        ax.set_ylabel(ylabel)
+    fig.tight_layout()
+    return fig
+
+
+def benchmark_figures_per_second(n_series=50, n_points=100, dpi=100):
+    """
+    Compare figures per second for fresh figures against a reused canvas.
+
+    Every figure is rendered to an in-memory PNG so the measurement includes
+    rasterization, as in a real export loop.
+
+    Parameters:
+        n_series: Number of series to render
+        n_points: Points per series
+        dpi: Output resolution
+
+    Returns:
+        results: Dict with figures per second for 'fresh' and 'canvas' and
+                 panels per second for 'small_multiples'
+    """
+    t = np.arange(n_points)
+    rng = np.random.default_rng(0)
+    data = rng.random((n_series, n_points))
+
+    start = time.perf_counter()
+    for i in range(n_series):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(t, data[i], 'b-', label=f'series {i}')
+        ax.set_title(f'series {i}')
+        ax.legend()
+        ax.grid(True)
+        fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+        plt.close(fig)
+    fresh = n_series / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    canvas = SeriesCanvas()
+    for i in range(n_series):
+        canvas.update(t, data[i], label=f'series {i}', title=f'series {i}')
+        canvas.save(io.BytesIO(), format='png', dpi=dpi)
+    canvas.close()
+    reused = n_series / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    fig = plot_small_multiples([(t, data[i], f'series {i}') for i in range(n_series)])
+    fig.savefig(io.BytesIO(), format='png', dpi=dpi)
+    plt.close(fig)
+    grid = n_series / (time.perf_counter() - start)
+
+    return {'fresh': fresh, 'canvas': reused, 'small_multiples': grid}
+
+
+if __name__ == "__main__":
+    for mode, rate in benchmark_figures_per_second().items():
+        print(f"{mode:16s} {rate:8.1f} figures/s")
@@ -1,9 +1,15 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+try:
+    from src.figure_export import FigureExporter
+    from src.instrumentation import stage, count
+except ImportError:
+    from figure_export import FigureExporter
+    from instrumentation import stage, count
 
 
 class HIVModel:
-    def __init__(self, A, alpha, B, beta):
+    def __init__(self, A, alpha, B, beta, dtype=None):
         """
         Initialize model parameters.
 
@@ -12,11 +18,14 @@ class HIVModel:
             alpha: Model parameter α
             B: Model parameter B
             beta: Model parameter β
+            dtype: Floating point type of the computation (e.g. np.float32;
+                   None keeps the input types)
         """
         self.A = A
         self.alpha = alpha
         self.B = B
         self.beta = beta
+        self.dtype = None if dtype is None else np.dtype(dtype)
 
     def viral_load(self, time):
         """
@@ -28,7 +37,39 @@ class HIVModel:
         Returns:
             Viral load array
         """
-        return self.A * np.exp(-self.alpha * time) + self.B * np.exp(-self.beta * time)
+        with stage('hiv.model'):
+            if self.dtype is None:
+                return self.A * np.exp(-self.alpha * time) + self.B * np.exp(-self.beta * time)
+            time = np.asarray(time, dtype=self.dtype)
+            A, alpha, B, beta = (self.dtype.type(v) for v in (self.A, self.alpha, self.B, self.beta))
+            return A * np.exp(-alpha * time) + B * np.exp(-beta * time)
+
+    def residuals(self, time_obs, load_obs):
+        """
+        Calculate model residuals at the observation times only.
+
+        Parameters:
+            time_obs: Observation times
+            load_obs: Observed viral load
+
+        Returns:
+            Residual array viral_load(time_obs) - load_obs
+        """
+        return self.viral_load(time_obs) - load_obs
+
+    def sse(self, time_obs, load_obs):
+        """
+        Calculate the sum of squared residuals at the observation times.
+
+        Parameters:
+            time_obs: Observation times
+            load_obs: Observed viral load
+
+        Returns:
+            Sum of squared residuals
+        """
+        r = self.residuals(time_obs, load_obs)
+        return float(np.dot(r, r))
 
     def plot_model(self, time, label=None):
         """
@@ -38,8 +79,136 @@ class HIVModel:
             time: Time array
             label: Curve label
         """
+        import matplotlib.pyplot as plt
+
         viral_load = self.viral_load(time)
-        plt.plot(time, viral_load, label=label)
+        with stage('hiv.render'):
+            plt.plot(time, viral_load, label=label)
+
+
+class HIVObjective:
+    """
+    Weighted sum of squared residuals on the observations, for optimizers.
+
+    The negated observation times are stored once and every intermediate
+    array is preallocated, so evaluating the objective or its gradient
+    allocates nothing. The parameter vector is (A, alpha, B, beta), or
+    (A, alpha) for a single exponential (terms=1).
+    """
+
+    def __init__(self, time_obs, load_obs, terms=2, weights=None):
+        """
+        Create the objective.
+
+        Parameters:
+            time_obs: Observation times
+            load_obs: Observed viral load
+            terms: Number of exponential terms (1 or 2)
+            weights: Per-observation weights (None for all ones; a 0/1 mask
+                     selects a cross-validation fold)
+        """
+        if terms not in (1, 2):
+            raise ValueError("terms must be 1 or 2")
+        self.terms = terms
+        self.n_params = 2 * terms
+        self.y = np.array(load_obs, dtype=float)
+        self.neg_t = -np.asarray(time_obs, dtype=float)
+        if self.neg_t.shape != self.y.shape:
+            raise ValueError("time_obs and load_obs must have the same shape")
+        self.weights = None if weights is None else np.array(weights, dtype=float)
+        n = self.y.size
+        self._e = np.empty((terms, n))  # exp(-alpha t), exp(-beta t)
+        self._r = np.empty(n)           # residuals
+        self._wr = np.empty(n)          # weighted residuals
+        self._tmp = np.empty(n)
+        self._grad = np.empty(self.n_params)
+        self._jac = np.empty((n, self.n_params))
+
+    def residuals(self, params):
+        """
+        Calculate residuals into an internal buffer (overwritten by the next call).
+
+        Parameters:
+            params: Parameter vector
+
+        Returns:
+            Residual array
+        """
+        e, r = self._e, self._r
+        np.subtract(0.0, self.y, out=r)
+        for k in range(self.terms):
+            np.multiply(self.neg_t, float(params[2 * k + 1]), out=e[k])
+            np.exp(e[k], out=e[k])
+            np.multiply(e[k], float(params[2 * k]), out=self._tmp)
+            r += self._tmp
+        if self.weights is None:
+            self._wr[:] = r
+        else:
+            np.multiply(r, self.weights, out=self._wr)
+        return r
+
+    def __call__(self, params):
+        """
+        Calculate the weighted sum of squared residuals.
+
+        Parameters:
+            params: Parameter vector
+
+        Returns:
+            Objective value
+        """
+        r = self.residuals(params)
+        return float(np.dot(self._wr, r))
+
+    def value_and_grad(self, params):
+        """
+        Calculate the objective value and its gradient together.
+
+        Parameters:
+            params: Parameter vector
+
+        Returns:
+            value: Objective value
+            grad: Gradient array (internal buffer)
+        """
+        value = self(params)
+        wr, tmp, grad = self._wr, self._tmp, self._grad
+        for k in range(self.terms):
+            # dV/dA = exp(-alpha t), dV/dalpha = -A t exp(-alpha t)
+            grad[2 * k] = 2.0 * np.dot(wr, self._e[k])
+            np.multiply(self._e[k], self.neg_t, out=tmp)
+            grad[2 * k + 1] = 2.0 * float(params[2 * k]) * np.dot(wr, tmp)
+        return value, grad
+
+    def gradient(self, params):
+        """
+        Calculate the gradient of the objective.
+
+        Parameters:
+            params: Parameter vector
+
+        Returns:
+            Gradient array (internal buffer)
+        """
+        return self.value_and_grad(params)[1]
+
+    def jacobian(self, params):
+        """
+        Calculate the (unweighted) Jacobian of the residuals.
+
+        Parameters:
+            params: Parameter vector
+
+        Returns:
+            Array of shape (n_obs, n_params) (internal buffer)
+        """
+        self.residuals(params)
+        jac = self._jac
+        for k in range(self.terms):
+            jac[:, 2 * k] = self._e[k]
+            np.multiply(self._e[k], self.neg_t, out=jac[:, 2 * k + 1])
+            jac[:, 2 * k + 1] *= float(params[2 * k])
+        return jac
 
 
 def load_hiv_data(filepath):
@@ -53,16 +222,18 @@ def load_hiv_data(filepath):
         time_data: Time data array
         viral_load_data: Viral load data array
     """
-    try:
-        # Try loading .npz file
-        hiv_data = np.load(filepath)
-        time_data = hiv_data['time_in_days']
-        viral_load_data = hiv_data['viral_load']
-    except:
-        # If .npz file doesn't exist, try loading .csv file
-        hiv_data = np.loadtxt(filepath, delimiter=',')
-        time_data = hiv_data[:, 0]
-        viral_load_data = hiv_data[:, 1]
+    with stage('hiv.load', path=str(filepath)):
+        try:
+            # Try loading .npz file
+            hiv_data = np.load(filepath)
+            time_data = hiv_data['time_in_days']
+            viral_load_data = hiv_data['viral_load']
+        except:
+            # If .npz file doesn't exist, try loading .csv file
+            hiv_data = np.loadtxt(filepath, delimiter=',')
+            time_data = hiv_data[:, 0]
+            viral_load_data = hiv_data[:, 1]
+    count('hiv.points', len(time_data))
     return time_data, viral_load_data
 
 
@@ -70,46 +241,47 @@ def main():
     """
     Main function to test the model.
     """
-    # Generate time series
-    time = np.linspace(0, 10, 100)
-
-    # Define different model parameters
-    models = [
-        HIVModel(A=1, alpha=1, B=0, beta=0),  # Only A and alpha are active
-        HIVModel(A=1, alpha=2, B=0, beta=0),  # Increase alpha
-        HIVModel(A=1, alpha=1, B=0.5, beta=0),  # Add B and beta
-        HIVModel(A=1, alpha=1, B=0.5, beta=2),  # Increase beta
-    ]
-
-    # Plot model curves with different parameters
-    plt.figure(figsize=(10, 6))
-    for i, model in enumerate(models):
-        model.plot_model(time, label=f"Model {i+1}")
-    plt.xlabel('Time (days)')
-    plt.ylabel('Viral Load (V(t))')
-    plt.title('HIV Viral Load Models')
-    plt.legend()
-    plt.grid(True)
-    plt.savefig('results/hiv_models.png', dpi=300)  # Save the figure
-    plt.show()
-
-    # Load experimental data
-    time_data, viral_load_data = load_hiv_data('data/HIVseries.csv')  # Or 'HIVseries.npz'
-    model = HIVModel(A=175000, alpha=0.6, B=0, beta=0)
-
-    # Plot experimental data and model on the same figure
-    plt.figure(figsize=(10, 6))
-    plt.scatter(time_data, viral_load_data, color='blue', label='Experimental Data', marker='o')
-    model.plot_model(time, label="Model")
-
-    # Add labels and title
-    plt.xlabel('Time (days)')
-    plt.ylabel('Viral Load (V(t))')
-    plt.title('HIV Viral Load Model Fitting')
-    plt.legend()
-    plt.grid(True)
-    plt.savefig('results/hiv_model_fitting.png', dpi=300)  # Save the figure
-    plt.show()
+    import matplotlib.pyplot as plt
+
+    with FigureExporter() as exporter:
+        # Generate time series
+        time = np.linspace(0, 10, 100)
+
+        # Define different model parameters
+        models = [
+            HIVModel(A=1, alpha=1, B=0, beta=0),  # Only A and alpha are active
+            HIVModel(A=1, alpha=2, B=0, beta=0),  # Increase alpha
+            HIVModel(A=1, alpha=1, B=0.5, beta=0),  # Add B and beta
+            HIVModel(A=1, alpha=1, B=0.5, beta=2),  # Increase beta
+        ]
+
+        # Plot model curves with different parameters
+        fig = plt.figure(figsize=(10, 6))
+        for i, model in enumerate(models):
+            model.plot_model(time, label=f"Model {i+1}")
+        plt.xlabel('Time (days)')
+        plt.ylabel('Viral Load (V(t))')
+        plt.title('HIV Viral Load Models')
+        plt.legend()
+        plt.grid(True)
+        exporter.submit(fig, 'results/hiv_models.png', dpi=300)  # Save the figure in the background
+
+        # Load experimental data
+        time_data, viral_load_data = load_hiv_data('data/HIVseries.csv')  # Or 'HIVseries.npz'
+        model = HIVModel(A=175000, alpha=0.6, B=0, beta=0)
+
+        # Plot experimental data and model on the same figure
+        fig = plt.figure(figsize=(10, 6))
+        plt.scatter(time_data, viral_load_data, color='blue', label='Experimental Data', marker='o')
+        model.plot_model(time, label="Model")
+
+        # Add labels and title
+        plt.xlabel('Time (days)')
+        plt.ylabel('Viral Load (V(t))')
+        plt.title('HIV Viral Load Model Fitting')
+        plt.legend()
+        plt.grid(True)
+        exporter.submit(fig, 'results/hiv_model_fitting.png', dpi=300)  # Save the figure in the background
 
 
 if __name__ == "__main__":
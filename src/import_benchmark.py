@@ -0,0 +1,105 @@
+"""
+Import-time benchmark for compute-only use of the modules
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+and the cumulative import time is compared with a budget. Compute-only
+modules must also not pull in matplotlib.
+
+Usage:
+    python -m src.import_benchmark [--budget-ms 400] [module ...]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules a compute-only worker process imports
+COMPUTE_MODULES = (
+    'src.logistic_map_student',
+    'src.millikan_fit_student',
+    'src.bacteria_model_student',
+    'src.hiv_model_student',
+    'src.map_engine',
+    'src.logistic_cycles',
+    'src.logistic_density',
+    'src.phase_diagram',
+    'src.coupled_lattice',
+    'src.divergence',
+)
+
+DEFAULT_BUDGET_MS = 400
+
+
+def measure_import(module, python=sys.executable):
+    """
+    Import a module in a fresh interpreter and time it.
+
+    Parameters:
+        module: Dotted module name
+        python: Interpreter to run
+
+    Returns:
+        result: Dict with 'module', 'total_ms' (cumulative import time of the
+                module), 'numpy_ms' (the part spent importing numpy) and
+                'matplotlib' (whether matplotlib got imported)
+    """
+    code = f"import sys, {module}; print('matplotlib' in sys.modules)"
+    env = dict(os.environ)
+    env.pop('CP_TRACE', None)
+    proc = subprocess.run([python, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, cwd=ROOT_DIR, env=env, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cum, name = line[len('import time:'):].split('|')
+        if cum.strip().isdigit():
+            cumulative[name.strip()] = int(cum)
+    return {
+        'module': module,
+        'total_ms': cumulative.get(module, 0) / 1000,
+        'numpy_ms': cumulative.get('numpy', 0) / 1000,
+        'matplotlib': proc.stdout.strip() == 'True',
+    }
+
+
+def check_budget(modules=COMPUTE_MODULES, budget_ms=DEFAULT_BUDGET_MS):
+    """
+    Measure every module and check it against the budget.
+
+    Parameters:
+        modules: Dotted module names
+        budget_ms: Maximum cumulative import time in milliseconds
+
+    Returns:
+        results: List of measurement dicts (see measure_import), each with an
+                 added 'ok' flag (under budget and without matplotlib)
+    """
+    results = []
+    for module in modules:
+        result = measure_import(module)
+        result['ok'] = result['total_ms'] <= budget_ms and not result['matplotlib']
+        results.append(result)
+    return results
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Check import time of compute-only modules")
+    parser.add_argument('modules', nargs='*', default=list(COMPUTE_MODULES))
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    results = check_budget(args.modules, args.budget_ms)
+    for r in results:
+        status = 'ok' if r['ok'] else 'FAIL'
+        note = ' (imports matplotlib)' if r['matplotlib'] else ''
+        print(f"{r['module']:32s} {r['total_ms']:8.1f} ms (numpy {r['numpy_ms']:6.1f} ms)  {status}{note}")
+    return 0 if all(r['ok'] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
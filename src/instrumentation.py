@@ -0,0 +1,295 @@
+"""
+Lightweight stage timers, counters and profiling hooks
+
+Instrumentation is off by default and ``stage()`` then returns a shared
+no-op context manager, so instrumented code pays one flag check per call.
+Turn it on either
+
+* with the environment variable ``CP_TRACE=trace.json`` (written at exit;
+  worker processes write ``trace.<pid>.json``, which the main process
+  merges into its own file if it has imported this module), optionally with
+  ``CP_TRACE_PROFILE=stage,...`` and ``CP_TRACE_MEMORY=stage,...``
+* or in code with ``with tracing('trace.json', profile=[...], memory=[...]):``
+
+The trace is a Chrome trace-event JSON file (open it in chrome://tracing or
+https://ui.perfetto.dev). Stages listed in ``profile`` are additionally run
+under cProfile (one ``.prof`` file per call next to the trace) and stages
+listed in ``memory`` under tracemalloc (peak size stored in the event).
+"""
+
+import atexit
+import contextlib
+import cProfile
+import glob
+import json
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+
+_NULL = contextlib.nullcontext()
+
+_enabled = False
+_events = []
+_counters = {}
+_profile_stages = frozenset()
+_memory_stages = frozenset()
+_output_prefix = 'trace'
+_profile_calls = {}
+_lock = threading.Lock()
+
+
+def is_enabled():
+    """Return True if instrumentation is recording."""
+    return _enabled
+
+
+def _now_us():
+    return time.perf_counter_ns() / 1000
+
+
+class _Stage:
+    """Context manager timing one stage occurrence."""
+
+    __slots__ = ('name', 'args', 'start', 'profiler', 'tracing_memory')
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.profiler = None
+        self.tracing_memory = False
+
+    def __enter__(self):
+        if self.name in _memory_stages and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracing_memory = True
+        if self.name in _profile_stages:
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                # Another profiler is already active (e.g. a nested profiled stage)
+                self.profiler = None
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        args = dict(self.args)
+        if self.profiler is not None:
+            self.profiler.disable()
+            with _lock:
+                call = _profile_calls.get(self.name, 0)
+                _profile_calls[self.name] = call + 1
+            path = f"{_output_prefix}.{self.name}.{call}.prof"
+            self.profiler.dump_stats(path)
+            args['profile'] = path
+        if self.tracing_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            args['peak_kb'] = peak / 1024
+        _events.append({
+            'name': self.name,
+            'cat': self.name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': self.start,
+            'dur': end - self.start,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        })
+        return False
+
+
+def stage(name, **args):
+    """
+    Time a named stage.
+
+    Parameters:
+        name: Stage name, 'module.stage' (the part before the dot is the category)
+        **args: Extra values stored with the trace event (e.g. problem size)
+
+    Returns:
+        context: Context manager; a shared no-op when instrumentation is off
+    """
+    if not _enabled:
+        return _NULL
+    return _Stage(name, args)
+
+
+def count(name, value=1):
+    """
+    Add to a named counter.
+
+    Parameters:
+        name: Counter name
+        value: Amount to add
+    """
+    if not _enabled:
+        return
+    with _lock:
+        total = _counters.get(name, 0) + value
+        _counters[name] = total
+    _events.append({'name': name, 'ph': 'C', 'ts': _now_us(), 'pid': os.getpid(),
+                    'tid': threading.get_ident(), 'args': {name: total}})
+
+
+def enable(profile=(), memory=(), output_prefix='trace'):
+    """
+    Start recording.
+
+    Parameters:
+        profile: Stage names to run under cProfile
+        memory: Stage names to run under tracemalloc
+        output_prefix: Path prefix of the .prof files
+    """
+    global _enabled, _profile_stages, _memory_stages, _output_prefix
+    _profile_stages = frozenset(profile)
+    _memory_stages = frozenset(memory)
+    _output_prefix = output_prefix
+    _enabled = True
+
+
+def disable():
+    """Stop recording (recorded events are kept until reset())."""
+    global _enabled
+    _enabled = False
+
+
+def reset():
+    """Drop all recorded events and counters."""
+    _events.clear()
+    _counters.clear()
+    _profile_calls.clear()
+
+
+def events():
+    """Return a copy of the recorded trace events."""
+    return list(_events)
+
+
+def counters():
+    """Return a copy of the counter totals."""
+    return dict(_counters)
+
+
+def summary(trace_events=None):
+    """
+    Aggregate the recorded stages.
+
+    Parameters:
+        trace_events: Events to aggregate (defaults to the recorded ones)
+
+    Returns:
+        totals: Dict mapping stage name to {'calls', 'total_ms', 'max_ms'}
+    """
+    totals = {}
+    for event in _events if trace_events is None else trace_events:
+        if event['ph'] != 'X':
+            continue
+        entry = totals.setdefault(event['name'], {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        entry['calls'] += 1
+        entry['total_ms'] += event['dur'] / 1000
+        entry['max_ms'] = max(entry['max_ms'], event['dur'] / 1000)
+    return totals
+
+
+def export_trace(path):
+    """
+    Write the recorded events as a Chrome trace-event JSON file.
+
+    Parameters:
+        path: Output file path
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events(), 'displayTimeUnit': 'ms',
+                   'otherData': {'counters': counters(), 'summary': summary()}}, f)
+
+
+@contextlib.contextmanager
+def tracing(path=None, profile=(), memory=()):
+    """
+    Record everything inside the block and optionally export it.
+
+    Parameters:
+        path: Trace file written on exit (None to only keep events in memory)
+        profile: Stage names to run under cProfile
+        memory: Stage names to run under tracemalloc
+    """
+    prefix = os.path.splitext(path)[0] if path else 'trace'
+    reset()
+    enable(profile, memory, prefix)
+    try:
+        yield
+    finally:
+        disable()
+        if path:
+            export_trace(path)
+
+
+def _split_env(name):
+    return [s for s in os.environ.get(name, '').split(',') if s]
+
+
+def _export_merged(path, worker_pattern):
+    """
+    Write the trace of the main process together with its workers' traces.
+
+    Parameters:
+        path: Output file path
+        worker_pattern: Glob of the files written by worker processes
+    """
+    export_trace(path)
+    with open(path) as f:
+        trace = json.load(f)
+    for worker_path in sorted(glob.glob(worker_pattern)):
+        try:
+            with open(worker_path) as f:
+                worker = json.load(f)
+        except (OSError, ValueError):
+            continue
+        trace['traceEvents'].extend(worker['traceEvents'])
+        for name, value in worker['otherData']['counters'].items():
+            trace['otherData']['counters'][name] = trace['otherData']['counters'].get(name, 0) + value
+    trace['otherData']['summary'] = summary(trace['traceEvents'])
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+
+
+def _start_env_trace():
+    """Enable tracing from CP_TRACE; worker processes write their own file."""
+    root, ext = os.path.splitext(os.environ['CP_TRACE'])
+    ext = ext or '.json'
+    # A multiprocessing child is never the root, even when the parent did not
+    # import this module and so never recorded its pid
+    is_root = (multiprocessing.parent_process() is None
+               and os.environ.get('CP_TRACE_ROOT_PID') == str(os.getpid()))
+    prefix = root if is_root else f"{root}.{os.getpid()}"
+    reset()
+    enable(_split_env('CP_TRACE_PROFILE'), _split_env('CP_TRACE_MEMORY'), prefix)
+    if is_root:
+        atexit.register(_export_merged, root + ext, f"{glob.escape(root)}.[0-9]*{ext}")
+    else:
+        # multiprocessing workers leave through os._exit, which skips atexit
+        from multiprocessing.util import Finalize
+        Finalize(None, export_trace, args=(prefix + ext,), exitpriority=0)
+
+
+class _ForkHook:
+    """Weak-referenceable owner for multiprocessing's after-fork registry."""
+
+
+if os.environ.get('CP_TRACE'):
+    import multiprocessing.util
+
+    if multiprocessing.parent_process() is None:
+        os.environ.setdefault('CP_TRACE_ROOT_PID', str(os.getpid()))
+    _start_env_trace()
+    os.register_at_fork(after_in_child=_start_env_trace)
+    # multiprocessing clears its finalizers after forking, then runs these hooks
+    _fork_hook = _ForkHook()
+    multiprocessing.util.register_after_fork(_fork_hook, lambda _: _start_env_trace())
@@ -0,0 +1,201 @@
+"""
+Attracting periodic orbits of the Logistic map without iteration
+
+Below the accumulation point, and in the periodic windows beyond it, the
+attractor of x_{n+1} = r x_n (1 - x_n) is a cycle whose points solve
+f^n(x) = x. Periods 1 and 2 have closed forms; longer periods are found
+as the real roots of the polynomial (f^n(x) - x) / x, computed for all r of
+the known periodic windows at once from a stack of companion matrices, and
+the cycle whose multiplier prod f'(x_i) lies inside the unit circle is
+kept. The Logistic map has at most one attracting cycle, so the first
+stable period found is the attractor.
+"""
+
+import numpy as np
+
+# Longest period solved by polynomial roots (degree 2^n - 1)
+MAX_PERIOD = 4
+
+# Steps per r beyond which solving for a period-n cycle beats iterating: the
+# batched eigen-solve costs about 14 us (n = 3) and 52 us (n = 4) per r, an
+# iteration step about 12 ns per r
+ROOT_SOLVE_STEPS = {3: 1500, 4: 5000}
+
+# r intervals (slightly widened) where a stable n-cycle exists: the period-4
+# stage of the period-doubling cascade and the windows beyond the
+# accumulation point. The stability check decides; the table only spares
+# the root finding for r that cannot have such a cycle.
+PERIODIC_WINDOWS = {
+    3: ((1 + np.sqrt(8), 3.8416),),
+    4: ((1 + np.sqrt(6), 3.5441), (3.9600, 3.9609)),
+}
+
+
+def _poly_mul(a, b):
+    """Multiply batched polynomials (coefficients in ascending order, one row per r)."""
+    out = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1))
+    for i in range(a.shape[1]):
+        out[:, i:i + b.shape[1]] += a[:, i:i + 1] * b
+    return out
+
+
+def cycle_polynomial(r, n):
+    """
+    Coefficients of (f^n(x) - x) / x for every r.
+
+    Parameters:
+        r: 1-D array of growth rates
+        n: Period
+
+    Returns:
+        coeffs: Array of shape (len(r), 2^n), ascending powers of x
+    """
+    r = np.asarray(r, dtype=float)[:, None]
+    p = np.zeros((r.shape[0], 2))
+    p[:, 1] = 1.0
+    for _ in range(n):
+        sq = _poly_mul(p, p)
+        sq[:, :p.shape[1]] -= p
+        p = -r * sq
+    p[:, 1] -= 1.0
+    # f^n(0) = 0, so x divides the polynomial exactly
+    return p[:, 1:]
+
+
+def _poly_div(a, b):
+    """
+    Exact division of batched polynomials (ascending coefficients).
+
+    Parameters:
+        a: Dividends, shape (m, N + 1)
+        b: Divisors, shape (m, M + 1), each dividing the matching row of a
+
+    Returns:
+        q: Quotients, shape (m, N - M + 1)
+    """
+    a = a.copy()
+    m_deg = b.shape[1] - 1
+    q = np.empty((a.shape[0], a.shape[1] - m_deg))
+    for k in range(q.shape[1] - 1, -1, -1):
+        q[:, k] = a[:, k + m_deg] / b[:, m_deg]
+        a[:, k:k + m_deg + 1] -= q[:, k:k + 1] * b
+    return q
+
+
+def _orbit(r, x, n):
+    """Cycle points and multiplier of n steps started at x (broadcast over r and x)."""
+    points = np.empty((n,) + np.broadcast(r, x).shape)
+    multiplier = np.ones(points.shape[1:])
+    for i in range(n):
+        points[i] = x
+        multiplier *= r * (1 - 2 * x)
+        x = r * x * (1 - x)
+    return points, multiplier, x
+
+
+def _roots(coeffs):
+    """Roots of batched polynomials via the eigenvalues of their companion matrices."""
+    m, d = coeffs.shape[0], coeffs.shape[1] - 1
+    companion = np.zeros((m, d, d))
+    companion[:, 1:, :-1] = np.eye(d - 1)
+    companion[:, :, -1] = -coeffs[:, :-1] / coeffs[:, -1:]
+    return np.linalg.eigvals(companion)
+
+
+def _polynomial_cycles(r, n, tol=1e-9):
+    """
+    Attracting n-cycles from the roots of f^n(x) - x.
+
+    Parameters:
+        r: 1-D array of growth rates
+        n: Period
+        tol: Largest accepted residual |f^n(x) - x| after polishing
+
+    Returns:
+        found: Boolean array, True where an attracting n-cycle exists
+        points: Array of shape (n, len(r)) with the cycle points (NaN elsewhere)
+    """
+    # Divide out the points of the largest proper divisor period d (f^d(x) = x
+    # implies f^n(x) = x), which lowers the degree from 2^n - 1 to 2^n - 2^d
+    d = next(n // p for p in range(2, n + 1) if n % p == 0)
+    coeffs = _poly_div(cycle_polynomial(r, n), cycle_polynomial(r, d))
+    roots = _roots(coeffs)
+    candidate = np.abs(roots.imag) < 1e-6
+    x = np.clip(roots.real, 0.0, 1.0)
+    rr = r[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Newton steps on g(x) = f^n(x) - x with g'(x) = multiplier - 1
+        for _ in range(2):
+            _, multiplier, fx = _orbit(rr, x, n)
+            slope = multiplier - 1
+            step = np.where(np.abs(slope) > 1e-12, (fx - x) / slope, 0.0)
+            x = x - step
+        _, multiplier, fx = _orbit(rr, x, n)
+    candidate &= (x >= 0) & (x <= 1) & (np.abs(fx - x) < tol) & (np.abs(multiplier) < 1)
+
+    score = np.where(candidate, np.abs(multiplier), np.inf)
+    best = np.argmin(score, axis=1)
+    found = np.isfinite(score[np.arange(len(r)), best])
+    points = np.full((n, len(r)), np.nan)
+    if found.any():
+        start = x[np.arange(len(r)), best][found]
+        points[:, found] = _orbit(r[found], start, n)[0]
+    return found, points
+
+
+def attracting_cycles(x0, r, max_period=MAX_PERIOD, n_steps=None):
+    """
+    Attracting cycle of the Logistic map for every r, where it has period <= max_period.
+
+    Parameters:
+        x0: Initial value; generic values in (0, 1) reach the attractor,
+            other values leave every r unresolved
+        r: Growth rate(s)
+        max_period: Longest period to look for
+        n_steps: Iterations per r the caller would otherwise spend; periods
+                 whose root solve costs more (see ROOT_SOLVE_STEPS) are left
+                 unresolved. None solves every period up to max_period
+
+    Returns:
+        period: Integer array, the cycle period (0 where unresolved, i.e.
+                chaotic, longer periods or neutrally stable parameters)
+        points: Array of shape (max_period, len(r)); the first period[j]
+                rows of column j hold the cycle points
+    """
+    r = np.atleast_1d(np.asarray(r, dtype=float))
+    period = np.zeros(r.shape, dtype=int)
+    points = np.full((max(max_period, 2), r.size), np.nan)
+    if not 0.0 < float(x0) < 1.0:
+        return period, points[:max_period]
+
+    # Period 1: x = 0 for r < 1, x = 1 - 1/r for 1 < r < 3
+    low = (r > 0) & (r < 1)
+    points[0, low] = 0.0
+    fixed = (r > 1) & (r < 3)
+    points[0, fixed] = 1 - 1 / r[fixed]
+    period[low | fixed] = 1
+
+    # Period 2: r^2 x^2 - r (r + 1) x + (r + 1) = 0, stable for 3 < r < 1 + sqrt(6)
+    if max_period >= 2:
+        two = (r > 3) & (r < 1 + np.sqrt(6))
+        rt = r[two]
+        root = np.sqrt((rt + 1) * (rt - 3))
+        points[0, two] = (rt + 1 - root) / (2 * rt)
+        points[1, two] = (rt + 1 + root) / (2 * rt)
+        period[two] = 2
+
+    for n in range(3, max_period + 1):
+        if n_steps is not None and n_steps < ROOT_SOLVE_STEPS.get(n, np.inf):
+            continue
+        search = (r > 3) & (r <= 4)
+        if n in PERIODIC_WINDOWS:
+            search = np.zeros(r.shape, dtype=bool)
+            for lo, hi in PERIODIC_WINDOWS[n]:
+                search |= (r >= lo) & (r <= hi)
+        todo = np.nonzero((period == 0) & search)[0]
+        if len(todo) == 0:
+            continue
+        found, cycle = _polynomial_cycles(r[todo], n)
+        period[todo[found]] = n
+        points[:n, todo[found]] = cycle[:, found]
+    return period, points[:max_period]
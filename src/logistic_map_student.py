@@ -3,27 +3,34 @@ Logistic Mapping and Chaos System Study
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
-def iterate_logistic(r, x0, n):
+try:
+    from src.figure_export import FigureExporter
+    from src.instrumentation import stage, count
+    from src.map_engine import LOGISTIC
+except ImportError:
+    from figure_export import FigureExporter
+    from instrumentation import stage, count
+    from map_engine import LOGISTIC
+
+def iterate_logistic(r, x0, n, dtype=np.float64):
     """
     Iterate the Logistic map.
 
     Parameters:
-        r: Growth rate parameter
+        r: Growth rate parameter (an array iterates one orbit per value)
         x0: Initial value
         n: Number of iterations
+        dtype: Floating point type of the result (e.g. np.float32)
 
     Returns:
-        x: Array of iterated values
+        x: Array of iterated values, shape (n,) or (n, len(r))
     """
-    x = np.zeros(n)
-    x[0] = x0
-    for i in range(1, n):
-        x[i] = r * x[i-1] * (1 - x[i-1])
-    return x
+    count('logistic.iterations', n * np.size(r))
+    with stage('logistic.iterate', n=n):
+        return LOGISTIC.iterate(r, x0, n, dtype=dtype)
 
-def plot_time_series(r, x0, n):
+def plot_time_series(r, x0, n, canvas=None):
     """
     Plot the time series of the Logistic map.
 
@@ -31,21 +38,29 @@ def plot_time_series(r, x0, n):
         r: Growth rate parameter
         x0: Initial value
         n: Number of iterations
+        canvas: Optional SeriesCanvas to update in place instead of
+                creating a new figure (for loops over many r)
 
     Returns:
         fig: matplotlib figure object
     """
+    import matplotlib.pyplot as plt
+
     x = iterate_logistic(r, x0, n)
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.plot(range(n), x, 'b-', label=f'r = {r}')
-    ax.set_xlabel('Iteration')
-    ax.set_ylabel('x')
-    ax.set_title(f'Logistic Map Time Series (r = {r})')
-    ax.legend()
-    ax.grid(True)
+    with stage('logistic.render', plot='time_series'):
+        if canvas is not None:
+            return canvas.update(np.arange(n), x, label=f'r = {r}',
+                                 title=f'Logistic Map Time Series (r = {r})')
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.plot(range(n), x, 'b-', label=f'r = {r}')
+        ax.set_xlabel('Iteration')
+        ax.set_ylabel('x')
+        ax.set_title(f'Logistic Map Time Series (r = {r})')
+        ax.legend()
+        ax.grid(True)
     return fig
 
-def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
+def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard, dtype=np.float64):
     """
     Plot the bifurcation diagram of the Logistic map.
 
@@ -55,49 +70,42 @@ def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
         n_r: Number of r values
         n_iterations: Number of iterations for each r
         n_discard: Number of initial iterations to discard for each r
+        dtype: Floating point type of the computed orbits
 
     Returns:
         fig: matplotlib figure object
     """
-    r_values = np.linspace(r_min, r_max, n_r)
-    x_values = []
-    
-    for r in r_values:
-        x = 0.5  # Initial value
-        # Discard the first n_discard iterations
-        for _ in range(n_discard):
-            x = r * x * (1 - x)
-        # Record the next n_iterations - n_discard iterations
-        for _ in range(n_iterations - n_discard):
-            x = r * x * (1 - x)
-            x_values.append((r, x))
-    
-    r_values_plot, x_values_plot = zip(*x_values)
+    import matplotlib.pyplot as plt
+
+    count('logistic.iterations', n_r * (n_discard + n_iterations))
+    with stage('logistic.bifurcation', n_r=n_r, n_iterations=n_iterations):
+        r_values_plot, x_values_plot = LOGISTIC.bifurcation(r_min, r_max, n_r, n_iterations, n_discard,
+                                                             x0=0.5, dtype=dtype)
     
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(r_values_plot, x_values_plot, s=0.1, c='k', marker='.')
-    ax.set_xlabel('r')
-    ax.set_ylabel('x')
-    ax.set_title('Logistic Map Bifurcation Diagram')
-    ax.grid(True)
+    with stage('logistic.render', plot='bifurcation'):
+        fig, ax = plt.subplots(figsize=(10, 6))
+        ax.scatter(r_values_plot, x_values_plot, s=0.1, c='k', marker='.')
+        ax.set_xlabel('r')
+        ax.set_ylabel('x')
+        ax.set_title('Logistic Map Bifurcation Diagram')
+        ax.grid(True)
     return fig
 
 def main():
     """Main function"""
-    # Time series analysis
-    r_values = [2.0, 3.2, 3.45, 3.6]
-    x0 = 0.5
-    n = 100
-    
-    for r in r_values:
-        fig = plot_time_series(r, x0, n)
-        fig.savefig(f"logistic_r{r}.png", dpi=300)
-        plt.close(fig)
-    
-    # Bifurcation diagram analysis
-    fig = plot_bifurcation(2.5, 4.0, 1000, 1000, 100)
-    fig.savefig("bifurcation.png", dpi=300)
-    plt.close(fig)
+    with FigureExporter() as exporter:
+        # Time series analysis
+        r_values = [2.0, 3.2, 3.45, 3.6]
+        x0 = 0.5
+        n = 100
+
+        for r in r_values:
+            fig = plot_time_series(r, x0, n)
+            exporter.submit(fig, f"logistic_r{r}.png", dpi=300)
+
+        # Bifurcation diagram analysis
+        fig = plot_bifurcation(2.5, 4.0, 1000, 1000, 100)
+        exporter.submit(fig, "bifurcation.png", dpi=300)
 
 if __name__ == "__main__":
     main()
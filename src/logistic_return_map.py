@@ -0,0 +1,151 @@
+"""
+Return maps and cobweb diagrams for long Logistic map trajectories
+
+Trajectories of 10^7+ steps cannot be drawn point by point. The functions
+here quantize consecutive pairs (x_n, x_{n+1}) onto a fixed grid, so the
+number of drawn primitives is bounded by the grid size instead of the
+trajectory length.
+"""
+
+import numpy as np
+
+try:
+    from src.logistic_map_student import iterate_logistic
+except ImportError:
+    from logistic_map_student import iterate_logistic
+
+
+def _pair_counts(x, bins):
+    """
+    Count consecutive pairs (x_n, x_{n+1}) on a bins x bins grid over [0, 1].
+
+    Parameters:
+        x: Trajectory array
+        bins: Number of quantization levels per axis
+
+    Returns:
+        counts: Integer array of shape (bins, bins), indexed [x_n bin, x_{n+1} bin]
+    """
+    x = np.asarray(x)
+    if len(x) < 2:
+        raise ValueError("Trajectory must contain at least two points")
+    codes = (x * bins).astype(np.int64)
+    np.clip(codes, 0, bins - 1, out=codes)
+    flat = codes[:-1] * bins + codes[1:]
+    return np.bincount(flat, minlength=bins * bins).reshape(bins, bins)
+
+
+def return_map_points(x, bins=1024, method='unique', min_count=1):
+    """
+    Reduce a trajectory to the distinct points of its return map.
+
+    Parameters:
+        x: Trajectory array
+        bins: Number of quantization levels per axis
+        method: 'unique' keeps every occupied cell once;
+                'density' also returns the visit count of each kept cell
+        min_count: Drop cells visited fewer times than this
+
+    Returns:
+        xn: x_n coordinates (cell centres)
+        xn1: x_{n+1} coordinates (cell centres)
+        counts: Visit counts of the kept cells (only for method='density')
+    """
+    if method not in ('unique', 'density'):
+        raise ValueError("method must be 'unique' or 'density'")
+    counts = _pair_counts(x, bins)
+    i, j = np.nonzero(counts >= min_count)
+    xn = (i + 0.5) / bins
+    xn1 = (j + 0.5) / bins
+    if method == 'density':
+        return xn, xn1, counts[i, j]
+    return xn, xn1
+
+
+def cobweb_segments(x, bins=512, min_count=1):
+    """
+    Build the de-duplicated line segments of a cobweb diagram.
+
+    Each step x_n -> x_{n+1} contributes a vertical segment from the diagonal
+    to the map curve and a horizontal segment back to the diagonal. Steps
+    that fall in the same quantized (x_n, x_{n+1}) cell are drawn once.
+
+    Parameters:
+        x: Trajectory array
+        bins: Number of quantization levels per axis
+        min_count: Drop steps whose cell was visited fewer times than this
+
+    Returns:
+        segments: Array of shape (2 * m, 2, 2) usable by LineCollection
+    """
+    xn, xn1 = return_map_points(x, bins, 'unique', min_count)
+    segments = np.empty((2 * len(xn), 2, 2))
+    segments[0::2, 0] = np.column_stack((xn, xn))
+    segments[0::2, 1] = np.column_stack((xn, xn1))
+    segments[1::2, 0] = np.column_stack((xn, xn1))
+    segments[1::2, 1] = np.column_stack((xn1, xn1))
+    return segments
+
+
+def plot_return_map(r, x0, n, n_discard=0, bins=1024, method='unique'):
+    """
+    Plot the x_{n+1} vs x_n return map of a long trajectory.
+
+    Parameters:
+        r: Growth rate parameter
+        x0: Initial value
+        n: Number of iterations
+        n_discard: Number of initial iterations to drop
+        bins: Number of quantization levels per axis
+        method: 'unique' draws each occupied cell as a point;
+                'density' draws the log visit density as an image
+
+    Returns:
+        fig: matplotlib figure object
+    """
+    import matplotlib.pyplot as plt
+
+    x = iterate_logistic(r, x0, n)[n_discard:]
+    fig, ax = plt.subplots(figsize=(6, 6))
+    if method == 'density':
+        counts = _pair_counts(x, bins)
+        ax.imshow(np.log1p(counts.T), origin='lower', extent=(0, 1, 0, 1), cmap='Greys', aspect='auto')
+    else:
+        xn, xn1 = return_map_points(x, bins, method)
+        ax.plot(xn, xn1, ',k')
+    ax.set_xlabel('$x_n$')
+    ax.set_ylabel('$x_{n+1}$')
+    ax.set_title(f'Logistic Map Return Map (r = {r})')
+    return fig
+
+
+def plot_cobweb(r, x0, n, n_discard=0, bins=512):
+    """
+    Plot the cobweb diagram of a long trajectory.
+
+    Parameters:
+        r: Growth rate parameter
+        x0: Initial value
+        n: Number of iterations
+        n_discard: Number of initial iterations to drop
+        bins: Number of quantization levels per axis
+
+    Returns:
+        fig: matplotlib figure object
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import LineCollection
+
+    x = iterate_logistic(r, x0, n)[n_discard:]
+    grid = np.linspace(0, 1, 500)
+    fig, ax = plt.subplots(figsize=(6, 6))
+    ax.plot(grid, r * grid * (1 - grid), 'b-', lw=1, label='f(x)')
+    ax.plot(grid, grid, 'k--', lw=0.8, label='y = x')
+    ax.add_collection(LineCollection(cobweb_segments(x, bins), colors='r', linewidths=0.3, alpha=0.5))
+    ax.set_xlim(0, 1)
+    ax.set_ylim(0, 1)
+    ax.set_xlabel('$x_n$')
+    ax.set_ylabel('$x_{n+1}$')
+    ax.set_title(f'Logistic Map Cobweb (r = {r})')
+    ax.legend()
+    return fig
@@ -0,0 +1,345 @@
+"""
+Generic engine for one-dimensional maps x_{n+1} = f(x_n, params)
+
+A map is described once by a vectorized function (and optionally its
+derivative). Iteration, bifurcation data and Lyapunov exponents are then
+computed for whole parameter sweeps as array operations, and sweeps over
+evenly spaced parameters are memoized. Maps that know their attracting
+cycles in closed form (the Logistic map) skip the iteration wherever the
+attractor is such a cycle.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+class OneDMap:
+    """
+    A one-dimensional map with its vectorized update rule.
+
+    Parameters:
+        name: Short name of the map
+        func: Vectorized update f(x, *params)
+        derivative: Vectorized derivative f'(x, *params), needed for Lyapunov exponents
+        domain: (low, high) interval the orbits live in, used for plot limits
+        default_x0: Initial value used when none is given
+        cycles: Optional function cycles(x0, *params, n_steps=...) returning the
+                period of the attracting cycle for each value of the first
+                parameter (0 where unknown) and its points, shape
+                (max_period, n_p); n_steps is the number of iterations per
+                value it replaces, so it can skip cycles that are dearer to
+                solve for than to iterate
+        scalar_iterate: Optional function scalar_iterate(x0, n, *params) with the
+                        update written inline, used for single float64 orbits
+                        so the loop avoids one func call per step
+    """
+
+    def __init__(self, name, func, derivative=None, domain=(0.0, 1.0), default_x0=0.5, cycles=None,
+                 scalar_iterate=None):
+        self.name = name
+        self.func = func
+        self.derivative = derivative
+        self.domain = domain
+        self.default_x0 = default_x0
+        self.cycles = cycles
+        self.scalar_iterate = scalar_iterate
+
+    def __repr__(self):
+        return f"OneDMap({self.name!r})"
+
+    def iterate(self, params, x0=None, n=100, dtype=np.float64):
+        """
+        Iterate the map, batched over parameter values.
+
+        Parameters:
+            params: Tuple of map parameters; each entry is a scalar or an
+                    array, and all entries broadcast together with x0
+            x0: Initial value(s) (defaults to the map's default_x0)
+            n: Number of values per orbit, including x0
+            dtype: Floating point type of the state and the result
+
+        Returns:
+            x: Array of shape (n,) for scalar inputs, otherwise (n,) + broadcast shape
+        """
+        dtype = np.dtype(dtype)
+        params = _as_tuple(params)
+        x0 = self.default_x0 if x0 is None else x0
+        if np.ndim(x0) == 0 and all(np.ndim(p) == 0 for p in params):
+            # Single orbit: a scalar loop beats per-step numpy calls on arrays.
+            # float64 runs on Python floats; other types on numpy scalars of
+            # that type, which round every operation like the array path
+            if dtype == np.float64:
+                params = tuple(float(p) for p in params)
+                if self.scalar_iterate is not None:
+                    return self.scalar_iterate(float(x0), n, *params)
+                xi = float(x0)
+            else:
+                params = tuple(dtype.type(p) for p in params)
+                xi = dtype.type(x0)
+            x = np.zeros(n, dtype=dtype)
+            if n == 0:
+                return x
+            x[0] = xi
+            func = self.func
+            for i in range(1, n):
+                xi = func(xi, *params)
+                x[i] = xi
+            return x
+
+        params = _cast_params(params, dtype)
+        shape = np.broadcast(np.asarray(x0), *params).shape
+        x = np.empty((n,) + shape, dtype=dtype)
+        if n == 0:
+            return x
+        x[0] = x0
+        for i in range(1, n):
+            x[i] = self.func(x[i - 1], *params)
+        return x
+
+    def transient(self, params, x0=None, n_discard=0, dtype=np.float64):
+        """
+        Advance orbits past their transient without storing it.
+
+        Parameters:
+            params: Tuple of map parameters (scalars or arrays)
+            x0: Initial value(s)
+            n_discard: Number of iterations to skip
+            dtype: Floating point type of the state
+
+        Returns:
+            x: State after n_discard iterations
+        """
+        params = _cast_params(_as_tuple(params), dtype)
+        x0 = self.default_x0 if x0 is None else x0
+        shape = np.broadcast(np.asarray(x0), *params).shape
+        x = np.broadcast_to(np.asarray(x0, dtype=dtype), shape).copy()
+        for _ in range(n_discard):
+            x = self.func(x, *params)
+        return x
+
+    def bifurcation(self, p_min, p_max, n_p, n_iterations, n_discard, x0=None, other_params=(), dtype=np.float64,
+                    analytic=True):
+        """
+        Bifurcation data over the first map parameter (memoized).
+
+        With analytic=True, a map with known cycles takes the attracting cycle
+        directly (computed in float64) wherever one is found, and only the
+        remaining parameter values are iterated. This only pays off when it
+        skips a long transient (n_p * n_discard >= ANALYTIC_MIN_WORK); the
+        kept rows have to be written either way.
+
+        Parameters:
+            p_min: Minimum value of the swept parameter
+            p_max: Maximum value of the swept parameter
+            n_p: Number of parameter values
+            n_iterations: Number of iterations for each parameter value
+            n_discard: Number of initial iterations to discard
+            x0: Initial value (defaults to the map's default_x0)
+            other_params: Fixed values of the remaining map parameters
+            dtype: Floating point type of the orbits (float32 halves the memory)
+            analytic: Use the map's cycles fast path where available
+
+        Returns:
+            p_plot: Parameter value of every recorded point (read-only)
+            x_plot: Orbit value of every recorded point (read-only)
+        """
+        x0 = self.default_x0 if x0 is None else float(x0)
+        return _bifurcation_cached(self, float(p_min), float(p_max), int(n_p), int(n_iterations),
+                                   int(n_discard), x0, tuple(other_params), np.dtype(dtype).str,
+                                   bool(analytic and self.cycles is not None and n_p * n_discard >= ANALYTIC_MIN_WORK))
+
+    def lyapunov(self, params, x0=None, n=1000, n_discard=100, dtype=np.float64):
+        """
+        Lyapunov exponent, batched over parameter values.
+
+        Parameters:
+            params: Tuple of map parameters (scalars or arrays)
+            x0: Initial value(s)
+            n: Number of iterations averaged
+            n_discard: Number of initial iterations to discard
+            dtype: Floating point type of the orbit; the log-derivative sum
+                   is always accumulated in float64
+
+        Returns:
+            lam: Mean of log|f'(x_n)| along each orbit
+        """
+        if self.derivative is None:
+            raise ValueError(f"Map {self.name} has no derivative")
+        params = _cast_params(_as_tuple(params), dtype)
+        x = self.transient(params, x0, n_discard, dtype)
+        total = np.zeros(x.shape, dtype=np.float64)
+        with np.errstate(divide='ignore'):
+            for _ in range(n):
+                total += np.log(np.abs(self.derivative(x, *params)))
+                x = self.func(x, *params)
+        lam = total / n
+        return lam if lam.ndim else float(lam)
+
+    def lyapunov_curve(self, p_min, p_max, n_p, n=1000, n_discard=100, x0=None, other_params=()):
+        """
+        Lyapunov exponent over evenly spaced values of the first parameter (memoized).
+
+        Parameters:
+            p_min: Minimum value of the swept parameter
+            p_max: Maximum value of the swept parameter
+            n_p: Number of parameter values
+            n: Number of iterations averaged
+            n_discard: Number of initial iterations to discard
+            x0: Initial value
+            other_params: Fixed values of the remaining map parameters
+
+        Returns:
+            p: Parameter values (read-only)
+            lam: Lyapunov exponents (read-only)
+        """
+        x0 = self.default_x0 if x0 is None else float(x0)
+        return _lyapunov_cached(self, float(p_min), float(p_max), int(n_p), int(n), int(n_discard),
+                                x0, tuple(other_params))
+
+
+def _as_tuple(params):
+    return params if isinstance(params, tuple) else (params,)
+
+
+def _cast_params(params, dtype):
+    return tuple(np.asarray(p, dtype=dtype) for p in params)
+
+
+def _read_only(*arrays):
+    for a in arrays:
+        a.flags.writeable = False
+    return arrays
+
+
+# Smallest n_p * n_discard for which bifurcation takes known cycles directly:
+# below it the skipped transient is cheaper than solving for the cycles
+ANALYTIC_MIN_WORK = 1_000_000
+
+# Largest number of contiguous unresolved runs written row by row
+_MAX_RUNS = 8
+
+
+@lru_cache(maxsize=32)
+def _bifurcation_cached(map_, p_min, p_max, n_p, n_iterations, n_discard, x0, other_params, dtype, analytic):
+    p = np.linspace(p_min, p_max, n_p, dtype=dtype)
+    n_keep = max(n_iterations - n_discard, 0)
+    orbit = np.empty((n_keep, n_p), dtype=dtype)
+    rest = np.ones(n_p, dtype=bool)
+    if analytic:
+        period, points = map_.cycles(x0, np.linspace(p_min, p_max, n_p), *other_params, n_steps=n_iterations)
+        rest = period == 0
+        if not rest.all():
+            # Write one common period of every cycle, then repeat it by doubling
+            # whole rows, which are contiguous copies
+            head = min(int(np.lcm.reduce(np.unique(period[~rest]))), n_keep)
+            phase = np.arange(head)[:, None] % np.maximum(period, 1)
+            orbit[:head] = np.take_along_axis(points, phase, axis=0)
+            filled = head
+            while filled < n_keep:
+                step = min(filled, n_keep - filled)
+                orbit[filled:filled + step] = orbit[:step]
+                filled += step
+
+    if rest.any():
+        params = _cast_params((p[rest],) + other_params, dtype)
+        x = map_.transient(params, x0, n_discard, dtype)
+        # The unresolved values form a few contiguous runs (usually the chaotic
+        # end of the sweep); writing the rows run by run avoids a scatter
+        starts = np.flatnonzero(rest & ~np.concatenate(([False], rest[:-1])))
+        ends = np.flatnonzero(rest & ~np.concatenate((rest[1:], [False]))) + 1
+        offsets = np.cumsum(ends - starts) - (ends - starts)
+        runs = list(zip(starts, ends, offsets))
+        if len(runs) <= _MAX_RUNS:
+            for i in range(n_keep):
+                x = map_.func(x, *params)
+                for a, b, offset in runs:
+                    orbit[i, a:b] = x[offset:offset + b - a]
+        else:
+            iterated = np.empty((n_keep, int(rest.sum())), dtype=dtype)
+            for i in range(n_keep):
+                x = map_.func(x, *params)
+                iterated[i] = x
+            orbit[:, rest] = iterated
+    return _read_only(np.tile(p, n_keep), orbit.ravel())
+
+
+@lru_cache(maxsize=32)
+def _lyapunov_cached(map_, p_min, p_max, n_p, n, n_discard, x0, other_params):
+    p = np.linspace(p_min, p_max, n_p)
+    lam = np.asarray(map_.lyapunov((p,) + other_params, x0, n, n_discard), dtype=float)
+    return _read_only(p, lam)
+
+
+def clear_cache():
+    """Drop all memoized bifurcation and Lyapunov sweeps."""
+    _bifurcation_cached.cache_clear()
+    _lyapunov_cached.cache_clear()
+
+
+# ---------------------------------------------------------------------------
+# Common maps
+# ---------------------------------------------------------------------------
+
+def _logistic_scalar_iterate(x0, n, r):
+    x = np.zeros(n)
+    if n == 0:
+        return x
+    x[0] = x0
+    # Inline update on a Python float: numpy scalar reads and per-step
+    # function calls are several times slower
+    xi = x0
+    for i in range(1, n):
+        xi = r * xi * (1 - xi)
+        x[i] = xi
+    return x
+
+
+def _logistic_cycles(x0, r, n_steps=None):
+    # Imported on first use, so the generic engine does not load the
+    # Logistic-specific root finder
+    try:
+        from src.logistic_cycles import attracting_cycles
+    except ImportError:
+        from logistic_cycles import attracting_cycles
+    return attracting_cycles(x0, r, n_steps=n_steps)
+
+
+LOGISTIC = OneDMap(
+    'logistic',
+    lambda x, r: r * x * (1 - x),
+    lambda x, r: r * (1 - 2 * x),
+    cycles=_logistic_cycles,
+    scalar_iterate=_logistic_scalar_iterate,
+)
+
+TENT = OneDMap(
+    'tent',
+    lambda x, mu: mu * np.minimum(x, 1 - x),
+    lambda x, mu: np.where(x < 0.5, mu, -mu),
+    default_x0=0.3,
+)
+
+SINE = OneDMap(
+    'sine',
+    lambda x, r: r * np.sin(np.pi * x),
+    lambda x, r: r * np.pi * np.cos(np.pi * x),
+)
+
+# beta comes first so bifurcation sweeps it at fixed alpha
+GAUSS = OneDMap(
+    'gauss',
+    lambda x, beta, alpha: np.exp(-alpha * x * x) + beta,
+    lambda x, beta, alpha: -2 * alpha * x * np.exp(-alpha * x * x),
+    domain=(-1.0, 1.5),
+    default_x0=0.0,
+)
+
+RICKER = OneDMap(
+    'ricker',
+    lambda x, r: x * np.exp(r * (1 - x)),
+    lambda x, r: np.exp(r * (1 - x)) * (1 - r * x),
+    domain=(0.0, 10.0),
+)
+
+MAPS = {m.name: m for m in (LOGISTIC, TENT, SINE, GAUSS, RICKER)}
@@ -3,7 +3,13 @@ Least Squares Fitting and Photoelectric Effect Experiment
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+
+try:
+    from src.figure_export import FigureExporter
+    from src.instrumentation import stage, count
+except ImportError:
+    from figure_export import FigureExporter
+    from instrumentation import stage, count
 
 def load_data(filename):
     """
@@ -16,19 +22,25 @@ def load_data(filename):
         x: Array of x values
         y: Array of y values
     """
-    try:
-        data = np.loadtxt(filename)
-        return data[:, 0], data[:, 1]
-    except Exception as e:
-        raise FileNotFoundError(f"Failed to load file: {filename}") from e
+    with stage('millikan.load', path=str(filename)):
+        try:
+            data = np.loadtxt(filename)
+        except Exception as e:
+            raise FileNotFoundError(f"Failed to load file: {filename}") from e
+    count('millikan.points', len(data))
+    return data[:, 0], data[:, 1]
 
-def calculate_parameters(x, y):
+def calculate_parameters(x, y, dtype=None):
     """
     Calculate least squares fitting parameters.
 
+    The moment sums are always accumulated in float64, so storing the data
+    in float32 only costs the rounding of the inputs.
+
     Parameters:
         x: Array of x values
         y: Array of y values
+        dtype: Floating point type the data is stored in (None keeps the input type)
 
     Returns:
         m: Slope of the fitted line
@@ -43,11 +55,14 @@ def calculate_parameters(x, y):
     if len(x) != len(y):
         raise ValueError("x and y arrays must have the same length")
     
-    N = len(x)
-    Ex = np.mean(x)
-    Ey = np.mean(y)
-    Exx = np.mean(x**2)
-    Exy = np.mean(x*y)
+    with stage('millikan.fit', n=len(x)):
+        N = len(x)
+        x = np.asarray(x, dtype=dtype)
+        y = np.asarray(y, dtype=dtype)
+        Ex = np.mean(x, dtype=np.float64)
+        Ey = np.mean(y, dtype=np.float64)
+        Exx = np.einsum('i,i->', x, x, dtype=np.float64) / N
+        Exy = np.einsum('i,i->', x, y, dtype=np.float64) / N
     
     denominator = Exx - Ex**2
     if denominator == 0:
@@ -71,16 +86,19 @@ def plot_data_and_fit(x, y, m, c):
     Returns:
         fig: matplotlib figure object
     """
+    import matplotlib.pyplot as plt
+
     if np.isnan(m) or np.isnan(c):
         raise ValueError("Slope and intercept cannot be NaN")
     
-    fig, ax = plt.subplots()
-    ax.scatter(x, y, label='Experimental Data')
-    y_fit = m*x + c
-    ax.plot(x, y_fit, 'r', label='Fitted Line')
-    ax.set_xlabel('Frequency (Hz)')
-    ax.set_ylabel('Voltage (V)')
-    ax.legend()
+    with stage('millikan.render'):
+        fig, ax = plt.subplots()
+        ax.scatter(x, y, label='Experimental Data')
+        y_fit = m*x + c
+        ax.plot(x, y_fit, 'r', label='Fitted Line')
+        ax.set_xlabel('Frequency (Hz)')
+        ax.set_ylabel('Voltage (V)')
+        ax.legend()
     return fig
 
 def calculate_planck_constant(m):
@@ -105,38 +123,39 @@ def calculate_planck_constant(m):
 
 def main():
     """Main function"""
-    try:
-        # Data file path
-        filename = "millikan.txt"
-        
-        # Load data
-        x, y = load_data(filename)
-        
-        # Calculate fitting parameters
-        m, c, Ex, Ey, Exx, Exy = calculate_parameters(x, y)
-        
-        # Print results
-        print(f"Ex = {Ex:.6e}")
-        print(f"Ey = {Ey:.6e}")
-        print(f"Exx = {Exx:.6e}")
-        print(f"Exy = {Exy:.6e}")
-        print(f"Slope m = {m:.6e}")
-        print(f"Intercept c = {c:.6e}")
-        
-        # Plot data and fitted line
-        fig = plot_data_and_fit(x, y, m, c)
-        
-        # Calculate Planck's constant
-        h, relative_error = calculate_planck_constant(m)
-        print(f"Calculated Planck's constant h = {h:.6e} J·s")
-        print(f"Relative error compared to actual value: {relative_error:.2f}%")
-        
-        # Save the figure
-        fig.savefig("millikan_fit.png", dpi=300)
-        plt.show()
-        
-    except Exception as e:
-        print(f"Error: {str(e)}")
+    with FigureExporter() as exporter:
+        try:
+            # Data file path
+            filename = "millikan.txt"
+
+            # Load data
+            x, y = load_data(filename)
+
+            # Calculate fitting parameters
+            m, c, Ex, Ey, Exx, Exy = calculate_parameters(x, y)
+
+            # Print results
+            print(f"Ex = {Ex:.6e}")
+            print(f"Ey = {Ey:.6e}")
+            print(f"Exx = {Exx:.6e}")
+            print(f"Exy = {Exy:.6e}")
+            print(f"Slope m = {m:.6e}")
+            print(f"Intercept c = {c:.6e}")
+
+            # Plot data and fitted line
+            fig = plot_data_and_fit(x, y, m, c)
+
+            # Calculate Planck's constant
+            h, relative_error = calculate_planck_constant(m)
+            print(f"Calculated Planck's constant h = {h:.6e} J·s")
+            print(f"Relative error compared to actual value: {relative_error:.2f}%")
+
+            # Save the figure in the background
+            exporter.submit(fig, "millikan_fit.png", dpi=300)
+            exporter.flush()
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,337 @@
+"""
+Model selection: V vs W bacteria models and single vs double exponential HIV models
+
+Every candidate model of every dataset is fitted on a process pool by
+weighted Levenberg-Marquardt on the observation-time objectives. Candidates
+are compared by AIC, BIC and k-fold cross-validated error. The k folds are
+0/1 weight masks built in one array, so the training fits reuse the same
+preallocated objective.
+
+Usage:
+    python -m src.model_selection [data_dir] [--folds 5] [--workers N] [--json out.json]
+"""
+
+import argparse
+import fnmatch
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from src.bacteria_model_student import BacteriaObjective, load_bacteria_data
+    from src.hiv_model_student import HIVObjective, load_hiv_data
+except ImportError:
+    from bacteria_model_student import BacteriaObjective, load_bacteria_data
+    from hiv_model_student import HIVObjective, load_hiv_data
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# File name pattern -> (dataset kind, loader)
+DATASET_PATTERNS = (
+    ('g149novick*', 'bacteria', load_bacteria_data),
+    ('HIVseries*', 'hiv', load_hiv_data),
+)
+
+_TAU_GRID = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+
+
+def _weights(objective):
+    return np.ones(objective.y.size) if objective.weights is None else objective.weights
+
+
+def _v_guesses(objective):
+    return [[tau] for tau in _TAU_GRID]
+
+
+def _w_guesses(objective):
+    # For fixed tau the model is linear in A, so A has a closed-form start
+    t = -objective.neg_t
+    w = _weights(objective)
+    guesses = []
+    for tau in _TAU_GRID:
+        g = np.exp(-t / tau) - 1 + t / tau
+        denom = np.dot(w * g, g)
+        guesses.append([np.dot(w * g, objective.y) / denom if denom > 0 else 1.0, tau])
+    return guesses
+
+
+def _log_linear_start(objective):
+    t = -objective.neg_t
+    keep = (objective.y > 0) & (_weights(objective) > 0)
+    if keep.sum() < 2:
+        return max(objective.y.max(), 1.0), 1.0
+    slope, intercept = np.polyfit(t[keep], np.log(objective.y[keep]), 1)
+    return math.exp(intercept), max(-slope, 1e-3)
+
+
+def _single_guesses(objective):
+    A, alpha = _log_linear_start(objective)
+    return [[A, alpha]]
+
+
+def _double_guesses(objective):
+    A, alpha = _log_linear_start(objective)
+    return [[0.9 * A, 2 * alpha, 0.1 * A, 0.2 * alpha],
+            [0.5 * A, alpha, 0.5 * A, 0.1 * alpha]]
+
+
+# Dataset kind -> candidate name -> (objective factory, initial guesses)
+CANDIDATES = {
+    'bacteria': {
+        'v': (lambda t, y: BacteriaObjective(t, y, 'v'), _v_guesses),
+        'w': (lambda t, y: BacteriaObjective(t, y, 'w'), _w_guesses),
+    },
+    'hiv': {
+        'single': (lambda t, y: HIVObjective(t, y, terms=1), _single_guesses),
+        'double': (lambda t, y: HIVObjective(t, y, terms=2), _double_guesses),
+    },
+}
+
+
+def levenberg_marquardt(objective, p0, max_iter=200, tol=1e-12):
+    """
+    Minimise a weighted least-squares objective by Levenberg-Marquardt.
+
+    Parameters:
+        objective: BacteriaObjective or HIVObjective (its weights are respected)
+        p0: Initial parameter vector
+        max_iter: Maximum number of iterations
+        tol: Stop when the relative decrease of the objective falls below this
+
+    Returns:
+        params: Fitted parameter vector
+        cost: Weighted sum of squared residuals at params
+    """
+    p = np.array(p0, dtype=float)
+    # Rejected trial steps may leave the domain (e.g. tau < 0) and overflow
+    with np.errstate(over='ignore', invalid='ignore'):
+        cost = objective(p)
+        lam = 1e-3
+        for _ in range(max_iter):
+            r = objective.residuals(p)
+            w = _weights(objective)
+            J = objective.jacobian(p)
+            g = J.T @ (w * r)
+            H = J.T @ (J * w[:, None])
+            d = np.maximum(np.diag(H), 1e-12 * max(np.diag(H).max(), 1e-300))
+            while lam < 1e12:
+                try:
+                    step = np.linalg.solve(H + lam * np.diag(d), -g)
+                except np.linalg.LinAlgError:
+                    lam *= 10
+                    continue
+                trial = p + step
+                trial_cost = objective(trial)
+                if np.isfinite(trial_cost) and trial_cost < cost:
+                    break
+                lam *= 10
+            else:
+                break
+            decrease = cost - trial_cost
+            p, cost, lam = trial, trial_cost, max(lam / 10, 1e-12)
+            if decrease <= tol * max(cost, 1e-300):
+                break
+    return p, float(objective(p))
+
+
+def _fit(objective, guesses):
+    best = None
+    for p0 in guesses:
+        p, cost = levenberg_marquardt(objective, p0)
+        if best is None or cost < best[1]:
+            best = (p, cost)
+    return best
+
+
+def fold_masks(n, k, seed=0):
+    """
+    Build all k-fold training masks at once.
+
+    Parameters:
+        n: Number of observations
+        k: Number of folds (clipped to n)
+        seed: Seed of the random fold assignment
+
+    Returns:
+        train: Boolean array of shape (k, n); row i is False on fold i
+    """
+    k = max(2, min(k, n))
+    folds = np.empty(n, dtype=int)
+    folds[np.random.default_rng(seed).permutation(n)] = np.arange(n) % k
+    return folds[None, :] != np.arange(k)[:, None]
+
+
+def fit_candidate(kind, model, t, y, k=5, seed=0):
+    """
+    Fit one candidate model to one dataset and score it.
+
+    Parameters:
+        kind: Dataset kind ('bacteria' or 'hiv')
+        model: Candidate name within the kind (see CANDIDATES)
+        t: Observation times
+        y: Observed values
+        k: Number of cross-validation folds
+        seed: Seed of the fold assignment
+
+    Returns:
+        row: Dict with 'model', 'n_params', 'params', 'sse', 'aic', 'bic' and 'cv_mse'
+    """
+    try:
+        factory, guesses = CANDIDATES[kind][model]
+    except KeyError:
+        raise ValueError(f"Unknown candidate {kind}/{model}") from None
+    objective = factory(t, y)
+    n, n_params = objective.y.size, objective.n_params
+    params, sse = _fit(objective, guesses(objective))
+
+    # Training fits warm-start from the full fit; held-out errors come from
+    # one (k, n) residual array
+    train = fold_masks(n, k, seed)
+    residuals = np.empty(train.shape)
+    for i, mask in enumerate(train):
+        objective.weights = mask.astype(float)
+        fold_params, _ = _fit(objective, [params])
+        residuals[i] = objective.residuals(fold_params)
+    objective.weights = None
+    cv_mse = float(np.sum(~train * residuals ** 2) / n)
+
+    log_term = n * math.log(max(sse, 1e-300) / n)
+    return {
+        'model': model,
+        'n_params': n_params,
+        'params': params.tolist(),
+        'sse': sse,
+        'aic': log_term + 2 * n_params,
+        'bic': log_term + n_params * math.log(n),
+        'cv_mse': cv_mse,
+    }
+
+
+def _mark_best(rows):
+    for key in ('aic', 'bic', 'cv_mse'):
+        best = min(row[key] for row in rows)
+        for row in rows:
+            row[f'best_{key}'] = row[key] == best
+    best_aic = min(row['aic'] for row in rows)
+    for row in rows:
+        row['delta_aic'] = row['aic'] - best_aic
+
+
+def select_models(datasets, k=5, seed=0, max_workers=None):
+    """
+    Fit and compare all candidate models of every dataset concurrently.
+
+    Parameters:
+        datasets: Dict name -> (kind, t, y)
+        k: Number of cross-validation folds
+        seed: Seed of the fold assignment
+        max_workers: Process pool size; 1 fits everything in this process
+
+    Returns:
+        rows: List of dicts (see fit_candidate) with added 'dataset', 'kind',
+              'delta_aic' and 'best_aic' / 'best_bic' / 'best_cv_mse' flags,
+              grouped by dataset
+    """
+    jobs = []
+    for name, (kind, t, y) in datasets.items():
+        if kind not in CANDIDATES:
+            raise ValueError(f"Unknown dataset kind: {kind}")
+        for model in CANDIDATES[kind]:
+            jobs.append((name, kind, model, np.asarray(t, dtype=float), np.asarray(y, dtype=float)))
+
+    if max_workers == 1:
+        results = [fit_candidate(kind, model, t, y, k, seed) for _, kind, model, t, y in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fit_candidate, kind, model, t, y, k, seed) for _, kind, model, t, y in jobs]
+            results = [future.result() for future in futures]
+
+    rows = []
+    for (name, kind, *_), result in zip(jobs, results):
+        rows.append({'dataset': name, 'kind': kind, **result})
+    for name in datasets:
+        _mark_best([row for row in rows if row['dataset'] == name])
+    return rows
+
+
+def discover_datasets(data_dir=DATA_DIR):
+    """
+    Load every recognised dataset of a directory.
+
+    Parameters:
+        data_dir: Directory to scan (files are matched against DATASET_PATTERNS)
+
+    Returns:
+        datasets: Dict file name -> (kind, t, y)
+    """
+    datasets = {}
+    for filename in sorted(os.listdir(data_dir)):
+        for pattern, kind, loader in DATASET_PATTERNS:
+            if fnmatch.fnmatch(filename, pattern):
+                t, y = loader(os.path.join(data_dir, filename))
+                datasets[filename] = (kind, t, y)
+                break
+    return datasets
+
+
+def select_directory(data_dir=DATA_DIR, **kwargs):
+    """
+    Run model selection over every recognised dataset in a directory.
+
+    Parameters:
+        data_dir: Directory to scan
+        **kwargs: Passed to select_models
+
+    Returns:
+        rows: Comparison rows (see select_models)
+    """
+    return select_models(discover_datasets(data_dir), **kwargs)
+
+
+def format_table(rows):
+    """
+    Format comparison rows as a markdown table.
+
+    Parameters:
+        rows: Output of select_models
+
+    Returns:
+        text: Markdown table
+    """
+    lines = [
+        "| dataset | model | k | SSE | AIC | ΔAIC | BIC | CV MSE | selected by |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        selected = ", ".join(name for name, key in (('AIC', 'best_aic'), ('BIC', 'best_bic'), ('CV', 'best_cv_mse'))
+                             if row[key])
+        lines.append(f"| {row['dataset']} | {row['model']} | {row['n_params']} | {row['sse']:.4g} "
+                     f"| {row['aic']:.2f} | {row['delta_aic']:.2f} | {row['bic']:.2f} | {row['cv_mse']:.4g} "
+                     f"| {selected} |")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Compare candidate models on every dataset of a directory")
+    parser.add_argument('data_dir', nargs='?', default=DATA_DIR)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', help="also write the rows to this JSON file")
+    args = parser.parse_args(argv)
+
+    rows = select_directory(args.data_dir, k=args.folds, seed=args.seed, max_workers=args.workers)
+    print(format_table(rows))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Two-parameter phase-diagram sweeps on a tiled, memory-mapped grid
+
+The (r, y) plane is cut into square tiles. Each tile is computed as one
+batch of orbits by a worker process and written straight into a ``.npy``
+memory map, and a small tile-completion map next to it lets an interrupted
+sweep resume where it stopped.
+
+The second axis y is either the initial value x0 of a single map
+(mode='x0') or the coupling strength eps of two symmetrically coupled maps
+(mode='coupling'):
+
+    x' = (1 - eps) f(x) + eps f(y),   y' = (1 - eps) f(y) + eps f(x)
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from src.map_engine import MAPS
+except ImportError:
+    from map_engine import MAPS
+
+MODES = ('x0', 'coupling')
+QUANTITIES = ('lyapunov', 'period')
+
+
+def _sidecar_paths(out_path):
+    return out_path + '.tiles.npy', out_path + '.json'
+
+
+def _tile_bounds(spec, ti, tj):
+    tile = spec['tile']
+    ny, nx = spec['shape']
+    return ti * tile, min((ti + 1) * tile, ny), tj * tile, min((tj + 1) * tile, nx)
+
+
+def _axes(spec):
+    ny, nx = spec['shape']
+    r = np.linspace(spec['r_range'][0], spec['r_range'][1], nx)
+    y = np.linspace(spec['y_range'][0], spec['y_range'][1], ny)
+    return r, y
+
+
+def _period(history, tol):
+    """
+    Smallest p with |x_p - x_0| < tol along the first axis of history.
+
+    Parameters:
+        history: Array of shape (max_period + 1, ...) of post-transient states
+                 (or a tuple of such arrays that must all repeat)
+        tol: Absolute tolerance
+
+    Returns:
+        period: Integer array, 0 where no period up to max_period was found
+    """
+    if not isinstance(history, tuple):
+        history = (history,)
+    first = history[0]
+    period = np.zeros(first.shape[1:], dtype=np.int64)
+    for p in range(1, first.shape[0]):
+        close = np.ones(first.shape[1:], dtype=bool)
+        for h in history:
+            close &= np.abs(h[p] - h[0]) < tol
+        period[(period == 0) & close] = p
+    return period
+
+
+def compute_tile(spec, r, y):
+    """
+    Compute the requested quantity for one block of the parameter plane.
+
+    Parameters:
+        spec: Sweep specification (see sweep_phase_diagram)
+        r: Map parameter values, array of shape (tw,)
+        y: Second-axis values, array of shape (th,)
+
+    Returns:
+        values: Array of shape (th, tw)
+    """
+    map_ = MAPS[spec['map']]
+    f, df = map_.func, map_.derivative
+    R, Y = np.meshgrid(r, y)
+    P = (R,) + tuple(spec.get('other_params', ()))
+    n, n_discard = spec['n'], spec['n_discard']
+
+    if spec['mode'] == 'x0':
+        if spec['quantity'] == 'lyapunov':
+            return map_.lyapunov(P, Y, n, n_discard)
+        x = map_.transient(P, Y, n_discard)
+        history = np.empty((spec['max_period'] + 1,) + x.shape)
+        history[0] = x
+        for i in range(1, len(history)):
+            history[i] = f(history[i - 1], *P)
+        return _period(history, spec['tol'])
+
+    eps = Y
+    x = np.full(R.shape, spec['x0'][0])
+    z = np.full(R.shape, spec['x0'][1])
+    for _ in range(n_discard):
+        fx, fz = f(x, *P), f(z, *P)
+        x, z = (1 - eps) * fx + eps * fz, (1 - eps) * fz + eps * fx
+
+    if spec['quantity'] == 'period':
+        hx = np.empty((spec['max_period'] + 1,) + x.shape)
+        hz = np.empty_like(hx)
+        hx[0], hz[0] = x, z
+        for i in range(1, len(hx)):
+            fx, fz = f(hx[i - 1], *P), f(hz[i - 1], *P)
+            hx[i] = (1 - eps) * fx + eps * fz
+            hz[i] = (1 - eps) * fz + eps * fx
+        return _period((hx, hz), spec['tol'])
+
+    # Largest Lyapunov exponent from a renormalised tangent vector
+    u = np.ones(R.shape) / np.sqrt(2)
+    v = u.copy()
+    total = np.zeros(R.shape)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(n):
+            dx, dz = df(x, *P), df(z, *P)
+            u, v = (1 - eps) * dx * u + eps * dz * v, eps * dx * u + (1 - eps) * dz * v
+            norm = np.hypot(u, v)
+            total += np.log(norm)
+            u /= norm
+            v /= norm
+            fx, fz = f(x, *P), f(z, *P)
+            x, z = (1 - eps) * fx + eps * fz, (1 - eps) * fz + eps * fx
+    return total / n
+
+
+def _run_tile(out_path, spec, ti, tj):
+    """
+    Worker entry point: compute one tile and write it into the memory maps.
+
+    Returns:
+        (ti, tj): The finished tile
+    """
+    r, y = _axes(spec)
+    i0, i1, j0, j1 = _tile_bounds(spec, ti, tj)
+    values = compute_tile(spec, r[j0:j1], y[i0:i1])
+
+    out = np.load(out_path, mmap_mode='r+')
+    out[i0:i1, j0:j1] = values
+    out.flush()
+    del out
+    # Mark the tile done only after its data has been flushed
+    done = np.load(_sidecar_paths(out_path)[0], mmap_mode='r+')
+    done[ti, tj] = True
+    done.flush()
+    return ti, tj
+
+
+def sweep_status(out_path):
+    """
+    Report the progress of a sweep.
+
+    Parameters:
+        out_path: Output .npy path of the sweep
+
+    Returns:
+        done: Number of finished tiles
+        total: Total number of tiles
+    """
+    done = np.load(_sidecar_paths(out_path)[0], mmap_mode='r')
+    return int(done.sum()), done.size
+
+
+def sweep_phase_diagram(out_path, r_range, y_range, shape=(4096, 4096), mode='x0', quantity='lyapunov',
+                        map_name='logistic', n=1000, n_discard=500, tile=256, max_period=64, tol=1e-6,
+                        x0=(0.3, 0.6), other_params=(), max_workers=None, max_tiles=None):
+    """
+    Sweep a two-parameter plane and store the result in a memory-mapped .npy file.
+
+    Calling it again with the same arguments resumes an interrupted sweep:
+    tiles already marked finished are skipped.
+
+    Parameters:
+        out_path: Output .npy path (sidecar files are written next to it)
+        r_range: (min, max) of the map parameter, along columns
+        y_range: (min, max) of x0 (mode='x0') or eps (mode='coupling'), along rows
+        shape: (rows, columns) of the output grid
+        mode: 'x0' or 'coupling'
+        quantity: 'lyapunov' (exponent) or 'period' (0 when none found)
+        map_name: Name of a map in map_engine.MAPS
+        n: Number of iterations averaged for the Lyapunov exponent
+        n_discard: Number of transient iterations
+        tile: Tile edge length
+        max_period: Largest period detected
+        tol: Tolerance of the period detection
+        x0: Initial values of the two coupled maps (mode='coupling')
+        other_params: Fixed values of the remaining map parameters
+        max_workers: Process pool size; 1 computes tiles in this process
+        max_tiles: Stop after computing this many tiles (None for all)
+
+    Returns:
+        result: Read-only memory map of shape `shape` (float32)
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    if quantity not in QUANTITIES:
+        raise ValueError(f"quantity must be one of {QUANTITIES}")
+    if map_name not in MAPS:
+        raise ValueError(f"Unknown map: {map_name}")
+    # Check the parameter count before any file is created
+    try:
+        MAPS[map_name].func(MAPS[map_name].default_x0, float(r_range[0]), *other_params)
+    except TypeError:
+        raise ValueError(f"Map {map_name} needs other_params for its remaining parameters") from None
+
+    spec = {
+        'r_range': [float(v) for v in r_range], 'y_range': [float(v) for v in y_range],
+        'shape': [int(v) for v in shape], 'mode': mode, 'quantity': quantity, 'map': map_name,
+        'n': int(n), 'n_discard': int(n_discard), 'tile': int(tile), 'max_period': int(max_period),
+        'tol': float(tol), 'x0': [float(v) for v in x0], 'other_params': [float(v) for v in other_params],
+    }
+    done_path, meta_path = _sidecar_paths(out_path)
+    n_tiles = (-(-spec['shape'][0] // tile), -(-spec['shape'][1] // tile))
+
+    resume = False
+    if os.path.exists(out_path) and os.path.exists(meta_path) and os.path.exists(done_path):
+        with open(meta_path) as f:
+            resume = json.load(f) == spec
+    if not resume:
+        np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=tuple(spec['shape'])).flush()
+        np.lib.format.open_memmap(done_path, mode='w+', dtype=bool, shape=n_tiles).flush()
+        with open(meta_path, 'w') as f:
+            json.dump(spec, f)
+
+    done = np.load(done_path)
+    todo = [(int(ti), int(tj)) for ti, tj in np.argwhere(~done)]
+    if max_tiles is not None:
+        todo = todo[:max_tiles]
+
+    if max_workers == 1:
+        for ti, tj in todo:
+            _run_tile(out_path, spec, ti, tj)
+    elif todo:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for future in [executor.submit(_run_tile, out_path, spec, ti, tj) for ti, tj in todo]:
+                future.result()
+
+    return np.load(out_path, mmap_mode='r')
+
+
+def plot_phase_diagram(result, r_range, y_range, quantity='lyapunov', ylabel='x0'):
+    """
+    Plot a phase diagram.
+
+    Parameters:
+        result: 2-D array returned by sweep_phase_diagram
+        r_range: (min, max) of the map parameter
+        y_range: (min, max) of the second parameter
+        quantity: 'lyapunov' or 'period', for the colour map and label
+        ylabel: y axis label
+
+    Returns:
+        fig: matplotlib figure object
+    """
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    if quantity == 'lyapunov':
+        image = ax.imshow(result, origin='lower', aspect='auto', cmap='RdBu_r', vmin=-1, vmax=1,
+                          extent=(*r_range, *y_range))
+    else:
+        image = ax.imshow(result, origin='lower', aspect='auto', cmap='tab20', interpolation='nearest',
+                          extent=(*r_range, *y_range))
+    fig.colorbar(image, ax=ax, label='Lyapunov exponent' if quantity == 'lyapunov' else 'period')
+    ax.set_xlabel('r')
+    ax.set_ylabel(ylabel)
+    ax.set_title(f'Phase Diagram ({quantity})')
+    return fig
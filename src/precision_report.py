@@ -0,0 +1,148 @@
+"""
+Accuracy report for reduced-precision (float32) compute paths
+
+Every workload is run in float64 and in the candidate precision, and the
+divergence is summarised so a precision can be picked per workload.
+
+Usage:
+    python -m src.precision_report
+"""
+
+import time
+
+import numpy as np
+
+try:
+    from src.bacteria_model_student import BacteriaModel
+    from src.hiv_model_student import HIVModel
+    from src.logistic_map_student import iterate_logistic
+    from src.map_engine import LOGISTIC
+    from src.millikan_fit_student import calculate_parameters
+except ImportError:
+    from bacteria_model_student import BacteriaModel
+    from hiv_model_student import HIVModel
+    from logistic_map_student import iterate_logistic
+    from map_engine import LOGISTIC
+    from millikan_fit_student import calculate_parameters
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _errors(reference, candidate):
+    reference = np.asarray(reference, dtype=np.float64)
+    candidate = np.asarray(candidate, dtype=np.float64)
+    abs_err = np.abs(candidate - reference)
+    scale = np.maximum(np.abs(reference), np.finfo(np.float64).tiny)
+    return float(abs_err.max()), float((abs_err / scale).max())
+
+
+def _raster(r, x, bins):
+    counts, _, _ = np.histogram2d(r, x, bins=bins, range=[[r.min(), r.max()], [0, 1]])
+    return counts > 0
+
+
+def default_workloads(size=1.0):
+    """
+    Declare the compared workloads.
+
+    Parameters:
+        size: Scale factor for the problem sizes
+
+    Returns:
+        workloads: Dict mapping name to a function of dtype returning an array
+    """
+    n = max(int(1_000 * size), 10)
+    grid = int(300 * size) or 1
+    t = np.linspace(0, 10, grid)
+    A, tau = np.meshgrid(np.linspace(0.5, 2.0, grid), np.linspace(0.5, 3.0, grid))
+    rng = np.random.default_rng(0)
+    x = np.sort(rng.uniform(5e14, 1.2e15, grid * 10))
+    y = 4.1e-15 * x - 1.7 + rng.normal(0, 0.05, x.size)
+
+    return {
+        'logistic_periodic(r=3.2)': lambda dtype: iterate_logistic(3.2, 0.5, n, dtype=dtype),
+        'logistic_chaotic(r=3.9)': lambda dtype: iterate_logistic(3.9, 0.5, n, dtype=dtype),
+        'bifurcation': lambda dtype: LOGISTIC.bifurcation(2.5, 4.0, grid, 1100, 100, x0=0.5, dtype=dtype),
+        'w_model_grid': lambda dtype: BacteriaModel(A[..., None], tau[..., None], dtype=dtype).w_model(t),
+        'viral_load_grid': lambda dtype: HIVModel(A[..., None] * 1e5, tau[..., None], 1e3, 0.1,
+                                                  dtype=dtype).viral_load(t),
+        'calculate_parameters': lambda dtype: np.array(calculate_parameters(x, y, dtype=dtype)[:2]),
+    }
+
+
+def precision_report(dtype=np.float32, workloads=None, tol=1e-2, raster_bins=(150, 150), raster_tol=0.05):
+    """
+    Compare a reduced precision with float64 on every workload.
+
+    Parameters:
+        dtype: Candidate floating point type
+        workloads: Dict as returned by default_workloads (None for the defaults)
+        tol: Relative error at which a workload counts as diverged
+        raster_bins: Pixel grid used to compare bifurcation rasters
+        raster_tol: Largest acceptable fraction of differing raster pixels
+
+    Returns:
+        rows: List of dicts with 'workload', 'max_abs_error', 'max_rel_error',
+              'time_ratio', 'memory_ratio', 'recommended' and, for trajectories,
+              'diverged_at' (first step whose error exceeds tol, or None) or,
+              for the bifurcation raster, 'pixel_mismatch' (fraction of
+              differing pixels among the occupied ones)
+    """
+    workloads = default_workloads() if workloads is None else workloads
+    rows = []
+    for name, func in workloads.items():
+        ref, t_ref = _timed(lambda: func(np.float64))
+        cand, t_cand = _timed(lambda: func(dtype))
+        row = {'workload': name, 'time_ratio': t_cand / t_ref if t_ref > 0 else float('nan')}
+
+        if isinstance(ref, tuple):  # bifurcation (r, x) pairs
+            ref_img = _raster(np.asarray(ref[0], np.float64), np.asarray(ref[1], np.float64), raster_bins)
+            cand_img = _raster(np.asarray(cand[0], np.float64), np.asarray(cand[1], np.float64), raster_bins)
+            row['pixel_mismatch'] = float((ref_img ^ cand_img).sum() / max((ref_img | cand_img).sum(), 1))
+            row['max_abs_error'], row['max_rel_error'] = _errors(ref[1], cand[1])
+            row['memory_ratio'] = cand[1].nbytes / ref[1].nbytes
+            row['recommended'] = row['pixel_mismatch'] < raster_tol
+        else:
+            row['max_abs_error'], row['max_rel_error'] = _errors(ref, cand)
+            row['memory_ratio'] = np.asarray(cand).nbytes / np.asarray(ref).nbytes
+            if name.startswith('logistic'):
+                rel = np.abs(np.asarray(cand, np.float64) - ref) / np.maximum(np.abs(ref), 1e-300)
+                bad = np.nonzero(rel > tol)[0]
+                row['diverged_at'] = int(bad[0]) if len(bad) else None
+            row['recommended'] = row['max_rel_error'] < tol
+        rows.append(row)
+    return rows
+
+
+def format_report(rows):
+    """
+    Format report rows as a markdown table.
+
+    Parameters:
+        rows: Output of precision_report
+
+    Returns:
+        text: Markdown table
+    """
+    lines = [
+        "| workload | max abs error | max rel error | notes | time ratio | memory ratio | use reduced precision |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for row in rows:
+        if 'pixel_mismatch' in row:
+            notes = f"{row['pixel_mismatch']:.2%} pixels differ"
+        elif 'diverged_at' in row:
+            notes = "never diverges" if row['diverged_at'] is None else f"diverges at step {row['diverged_at']}"
+        else:
+            notes = ""
+        lines.append(f"| {row['workload']} | {row['max_abs_error']:.3e} | {row['max_rel_error']:.3e} | {notes} "
+                     f"| {row['time_ratio']:.2f} | {row['memory_ratio']:.2f} | {'yes' if row['recommended'] else 'no'} |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_report(precision_report()))
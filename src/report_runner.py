@@ -0,0 +1,462 @@
+"""
+Batch report runner: all four analyses as a parallel task graph
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+# Imported here so that CP_TRACE makes this process the trace root before the
+# pool starts; it then merges the workers' traces into its own file at exit
+try:
+    from src import instrumentation  # noqa: F401
+except ImportError:
+    import instrumentation  # noqa: F401
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+CACHE_FILE = '.report_cache.json'
+TIMING_FILE = 'report_timings.json'
+
+
+class TaskGraphError(RuntimeError):
+    """
+    Raised by run_graph after the cache and timings are written when tasks failed.
+
+    Attributes:
+        failed: Names of the failed tasks
+        timings: The timings dict run_graph would have returned
+    """
+
+    def __init__(self, failed, timings):
+        super().__init__(f"{len(failed)} task(s) failed: {', '.join(failed)}")
+        self.failed = failed
+        self.timings = timings
+
+
+class Task:
+    """
+    One node of the report graph.
+
+    Parameters:
+        name: Unique task name
+        func: Module-level function run in a worker process; it receives
+              ``output_dir`` plus ``params`` as keyword arguments (and
+              ``dep_results`` when the task has dependencies) and returns a
+              JSON-serialisable dict with an ``outputs`` list of written files
+        params: Keyword arguments for func
+        inputs: Data files the task reads (their contents enter the cache key)
+        deps: Names of tasks that must finish first
+    """
+
+    def __init__(self, name, func, params=None, inputs=(), deps=()):
+        self.name = name
+        self.func = func
+        self.params = dict(params or {})
+        self.inputs = tuple(inputs)
+        self.deps = tuple(deps)
+
+
+def _file_digest(path):
+    """
+    Hash a file's contents.
+
+    Parameters:
+        path: File path
+
+    Returns:
+        digest: Hex SHA-256 digest, or None if the file is missing
+    """
+    if not os.path.exists(path):
+        return None
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def code_fingerprint(func=None):
+    """
+    Hash the source code a task may run.
+
+    Parameters:
+        func: Task function; its module's source file is hashed along with src/*.py
+
+    Returns:
+        digest: Hex SHA-256 digest over the file names and contents
+    """
+    src_dir = os.path.join(ROOT_DIR, 'src')
+    paths = sorted(os.path.join(src_dir, name) for name in os.listdir(src_dir) if name.endswith('.py'))
+    module = sys.modules.get(getattr(func, '__module__', None))
+    module_file = getattr(module, '__file__', None)
+    if module_file and os.path.abspath(module_file) not in paths:
+        paths.append(os.path.abspath(module_file))
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.relpath(path, ROOT_DIR).encode())
+        h.update((_file_digest(path) or '').encode())
+    return h.hexdigest()
+
+
+def task_key(task, dep_keys, code=None):
+    """
+    Compute the cache key of a task.
+
+    Parameters:
+        task: Task instance
+        dep_keys: Cache keys of the task's dependencies, by name
+        code: Code fingerprint (see code_fingerprint); computed when None
+
+    Returns:
+        key: Hex digest over function, code, parameters, input contents and dependency keys
+    """
+    payload = {
+        'func': f"{task.func.__module__}.{task.func.__qualname__}",
+        'code': code_fingerprint(task.func) if code is None else code,
+        'params': task.params,
+        'inputs': {path: _file_digest(path) for path in task.inputs},
+        'deps': {name: dep_keys[name] for name in task.deps},
+    }
+    blob = json.dumps(payload, sort_keys=True, default=repr).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _run_task(func, params, output_dir, dep_results):
+    """
+    Worker-side wrapper that times a task.
+
+    Returns:
+        result: The task's result dict
+        elapsed: Wall time spent inside the task in seconds
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    kwargs = dict(params)
+    if dep_results is not None:
+        kwargs['dep_results'] = dep_results
+    start = time.perf_counter()
+    result = func(output_dir=output_dir, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _check_graph(tasks):
+    """
+    Validate names and dependencies and return a topological order.
+
+    Parameters:
+        tasks: List of Task instances
+
+    Returns:
+        order: Task names in dependency order
+    """
+    by_name = {}
+    for task in tasks:
+        if task.name in by_name:
+            raise ValueError(f"Duplicate task name: {task.name}")
+        by_name[task.name] = task
+    for task in tasks:
+        for dep in task.deps:
+            if dep not in by_name:
+                raise ValueError(f"Task {task.name} depends on unknown task {dep}")
+
+    order = []
+    state = {}
+
+    def visit(name):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'active':
+            raise ValueError(f"Dependency cycle through task {name}")
+        state[name] = 'active'
+        for dep in by_name[name].deps:
+            visit(dep)
+        state[name] = 'done'
+        order.append(name)
+
+    for task in tasks:
+        visit(task.name)
+    return order
+
+
+def run_graph(tasks, output_dir, max_workers=None, force=False):
+    """
+    Run a task graph, executing independent tasks concurrently.
+
+    Tasks whose cache key matches the previous run and whose outputs still
+    exist are skipped and their stored results reused. A task that raises is
+    recorded as 'failed' with its error and its dependents as 'skipped'; the
+    other tasks still run and the cache and timings are still written.
+
+    Parameters:
+        tasks: List of Task instances
+        output_dir: Directory for outputs, the cache and the timing summary
+        max_workers: Process pool size (None for the number of CPUs)
+        force: Re-run every task regardless of the cache
+
+    Returns:
+        timings: Dict mapping task name to {'status', 'seconds', 'key'}
+                 ('error' for failed tasks)
+
+    Raises:
+        TaskGraphError: If any task failed (after writing cache and timings)
+    """
+    order = _check_graph(tasks)
+    by_name = {task.name: task for task in tasks}
+    os.makedirs(output_dir, exist_ok=True)
+
+    cache_path = os.path.join(output_dir, CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path) and not force:
+        with open(cache_path) as f:
+            cache = json.load(f)
+
+    keys = {}
+    results = {}
+    timings = {}
+    unfinished = set()
+    remaining = list(order)
+    running = {}
+    start_times = {}
+    total_start = time.perf_counter()
+    code = code_fingerprint()
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            for name in list(remaining):
+                task = by_name[name]
+                blocked = [dep for dep in task.deps if dep in unfinished]
+                if blocked:
+                    remaining.remove(name)
+                    unfinished.add(name)
+                    timings[name] = {'status': 'skipped', 'seconds': 0.0,
+                                     'error': f"dependency failed: {', '.join(blocked)}"}
+                    continue
+                if any(dep not in results for dep in task.deps):
+                    continue
+                remaining.remove(name)
+                keys[name] = task_key(task, keys, code)
+                entry = cache.get(name)
+                if (entry is not None and entry['key'] == keys[name]
+                        and all(os.path.exists(p) for p in entry['result'].get('outputs', []))):
+                    results[name] = entry['result']
+                    timings[name] = {'status': 'cached', 'seconds': 0.0, 'key': keys[name]}
+                    continue
+                dep_results = {dep: results[dep] for dep in task.deps} if task.deps else None
+                future = executor.submit(_run_task, task.func, task.params, output_dir, dep_results)
+                running[future] = name
+                start_times[name] = time.perf_counter()
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    result, elapsed = future.result()
+                except Exception as e:
+                    unfinished.add(name)
+                    timings[name] = {
+                        'status': 'failed',
+                        'seconds': time.perf_counter() - start_times[name],
+                        'key': keys[name],
+                        'error': f"{type(e).__name__}: {e}",
+                    }
+                    continue
+                results[name] = result
+                cache[name] = {'key': keys[name], 'result': result}
+                timings[name] = {
+                    'status': 'ran',
+                    'seconds': elapsed,
+                    'wall_seconds': time.perf_counter() - start_times[name],
+                    'key': keys[name],
+                }
+
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+    summary = {'total_seconds': time.perf_counter() - total_start, 'tasks': timings}
+    with open(os.path.join(output_dir, TIMING_FILE), 'w') as f:
+        json.dump(summary, f, indent=2)
+    failed = [name for name in order if timings[name]['status'] == 'failed']
+    if failed:
+        raise TaskGraphError(failed, timings)
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# Task functions. They live at module level so worker processes can import them.
+# ---------------------------------------------------------------------------
+
+def _save(fig, path):
+    import matplotlib.pyplot as plt
+    fig.savefig(path, dpi=300)
+    plt.close(fig)
+    return path
+
+
+def logistic_time_series_task(output_dir, r, x0, n):
+    """Logistic time series for a single r."""
+    from src.logistic_map_student import plot_time_series
+    path = _save(plot_time_series(r, x0, n), os.path.join(output_dir, f"logistic_r{r}.png"))
+    return {'outputs': [path]}
+
+
+def logistic_bifurcation_task(output_dir, r_min, r_max, n_r, n_iterations, n_discard):
+    """Logistic bifurcation diagram."""
+    from src.logistic_map_student import plot_bifurcation
+    fig = plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard)
+    path = _save(fig, os.path.join(output_dir, "bifurcation.png"))
+    return {'outputs': [path]}
+
+
+def bacteria_task(output_dir, models, model_type, t_max, title, filename, data_file=None, data_t_max=None):
+    """Bacteria V(t)/W(t) curves, optionally against experimental data."""
+    from src.bacteria_model_student import BacteriaModel, load_bacteria_data, plot_models_and_data
+    from src.figure_export import FigureExporter
+
+    time_data = response_data = None
+    if data_file is not None:
+        time_data, response_data = load_bacteria_data(data_file)
+        if data_t_max is not None:
+            mask = time_data <= data_t_max
+            time_data, response_data = time_data[mask], response_data[mask]
+    t = np.linspace(0, t_max, 100)
+    path = os.path.join(output_dir, filename)
+    with FigureExporter(max_workers=1) as exporter:
+        plot_models_and_data([BacteriaModel(A=A, tau=tau) for A, tau in models], t,
+                             time_data, response_data, title=title, model_type=model_type,
+                             save_path=path, exporter=exporter)
+    return {'outputs': [path]}
+
+
+def hiv_task(output_dir, models, title, filename, data_file=None):
+    """HIV viral load curves, optionally against experimental data."""
+    import matplotlib.pyplot as plt
+    from src.hiv_model_student import HIVModel, load_hiv_data
+
+    time = np.linspace(0, 10, 100)
+    fig = plt.figure(figsize=(10, 6))
+    if data_file is not None:
+        time_data, viral_load_data = load_hiv_data(data_file)
+        plt.scatter(time_data, viral_load_data, color='blue', label='Experimental Data', marker='o')
+    for i, params in enumerate(models):
+        HIVModel(*params).plot_model(time, label=f"Model {i+1}" if len(models) > 1 else "Model")
+    plt.xlabel('Time (days)')
+    plt.ylabel('Viral Load (V(t))')
+    plt.title(title)
+    plt.legend()
+    plt.grid(True)
+    return {'outputs': [_save(fig, os.path.join(output_dir, filename))]}
+
+
+def millikan_task(output_dir, data_file):
+    """Millikan least-squares fit and Planck's constant."""
+    from src.millikan_fit_student import (load_data, calculate_parameters,
+                                          plot_data_and_fit, calculate_planck_constant)
+    x, y = load_data(data_file)
+    m, c, Ex, Ey, Exx, Exy = calculate_parameters(x, y)
+    h, relative_error = calculate_planck_constant(m)
+    path = _save(plot_data_and_fit(x, y, m, c), os.path.join(output_dir, "millikan_fit.png"))
+    return {'outputs': [path], 'm': float(m), 'c': float(c), 'h': float(h),
+            'relative_error': float(relative_error)}
+
+
+def summary_task(output_dir, dep_results):
+    """Collect the outputs and numbers of every other task into one markdown file."""
+    path = os.path.join(output_dir, "report_summary.md")
+    with open(path, 'w') as f:
+        f.write("# Report summary\n\n")
+        for name in sorted(dep_results):
+            result = dep_results[name]
+            f.write(f"## {name}\n\n")
+            for output in result.get('outputs', []):
+                f.write(f"- {os.path.relpath(output, output_dir)}\n")
+            for key, value in sorted(result.items()):
+                if key != 'outputs':
+                    f.write(f"- {key} = {value:.6e}\n")
+            f.write("\n")
+    return {'outputs': [path]}
+
+
+def default_tasks(data_dir=DATA_DIR):
+    """
+    Declare the nightly report: every analysis of the four modules.
+
+    Parameters:
+        data_dir: Directory holding the experimental data files
+
+    Returns:
+        tasks: List of Task instances
+    """
+    novick_a = os.path.join(data_dir, 'g149novickA.txt')
+    novick_b = os.path.join(data_dir, 'g149novickB.txt')
+    hiv = os.path.join(data_dir, 'HIVseries.csv')
+    millikan = os.path.join(data_dir, 'millikan.txt')
+
+    tasks = [
+        Task(f"logistic_r{r}", logistic_time_series_task, {'r': r, 'x0': 0.5, 'n': 100})
+        for r in (2.0, 3.2, 3.45, 3.6)
+    ]
+    tasks += [
+        Task("logistic_bifurcation", logistic_bifurcation_task,
+             {'r_min': 2.5, 'r_max': 4.0, 'n_r': 1000, 'n_iterations': 1000, 'n_discard': 100}),
+        Task("bacteria_w_A1_tau1", bacteria_task,
+             {'models': [(1.0, 1.0)], 'model_type': 'w', 't_max': 2,
+              'title': 'W(t) for A=1.0, τ=1.0', 'filename': 'w_model_A1_tau1.png'}),
+        Task("bacteria_w_params", bacteria_task,
+             {'models': [(1.0, 1.0), (2.0, 1.0), (1.0, 2.0)], 'model_type': 'w', 't_max': 2,
+              'title': 'W(t) for Different Parameters', 'filename': 'w_model_different_params.png'}),
+        Task("bacteria_v_fit_A", bacteria_task,
+             {'models': [(1.5, 1.8)], 'model_type': 'v', 't_max': 10, 'data_file': novick_a,
+              'title': 'Model Fitting to Experimental Data (g149novickA)',
+              'filename': 'v_model_fit_g149novickA.png'},
+             inputs=[novick_a]),
+        Task("bacteria_w_fit_B", bacteria_task,
+             {'models': [(1.2, 1.5)], 'model_type': 'w', 't_max': 10, 'data_file': novick_b,
+              'data_t_max': 10, 'title': 'Model Fitting to Experimental Data (g149novickB, t ≤ 10)',
+              'filename': 'w_model_fit_g149novickB.png'},
+             inputs=[novick_b]),
+        Task("hiv_models", hiv_task,
+             {'models': [(1, 1, 0, 0), (1, 2, 0, 0), (1, 1, 0.5, 0), (1, 1, 0.5, 2)],
+              'title': 'HIV Viral Load Models', 'filename': 'hiv_models.png'}),
+        Task("hiv_fit", hiv_task,
+             {'models': [(175000, 0.6, 0, 0)], 'data_file': hiv,
+              'title': 'HIV Viral Load Model Fitting', 'filename': 'hiv_model_fitting.png'},
+             inputs=[hiv]),
+        Task("millikan_fit", millikan_task, {'data_file': millikan}, inputs=[millikan]),
+    ]
+    tasks.append(Task("summary", summary_task, deps=[task.name for task in tasks]))
+    return tasks
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Run all four analyses as a parallel task graph")
+    parser.add_argument('--output-dir', default=os.path.join(ROOT_DIR, 'results', 'report'))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help="ignore the cache and re-run every task")
+    args = parser.parse_args()
+
+    try:
+        timings = run_graph(default_tasks(args.data_dir), args.output_dir,
+                            max_workers=args.workers, force=args.force)
+        status = 0
+    except TaskGraphError as e:
+        timings = e.timings
+        status = 1
+    for name, timing in timings.items():
+        note = f"  {timing['error']}" if 'error' in timing else ''
+        print(f"{name:24s} {timing['status']:7s} {timing['seconds']:8.3f} s{note}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""
+Parameter-scan service for interactive exploration of the model curves
+
+Model curves are precomputed on a lattice over the parameter ranges. A
+request is snapped to a fine quantization grid along every axis, the
+curve is interpolated (multilinear) from the surrounding lattice points and
+kept in an LRU cache keyed by the quantized parameters, together with its
+encoded JSON response. Repeated or nearby slider positions are then served
+straight from the cache.
+
+Usage:
+    python -m src.scan_server --port 8765
+    curl 'http://127.0.0.1:8765/curve?model=hiv&A=150000&alpha=0.6&B=0&beta=0'
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from itertools import product
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+
+try:
+    from src.bacteria_model_student import BacteriaModel
+    from src.hiv_model_student import HIVModel
+except ImportError:
+    from bacteria_model_student import BacteriaModel
+    from hiv_model_student import HIVModel
+
+# Model name -> (parameter names, vectorized evaluation f(params dict, t))
+MODELS = {
+    'bacteria_v': (('tau',), lambda p, t: BacteriaModel(1.0, p['tau']).v_model(t)),
+    'bacteria_w': (('A', 'tau'), lambda p, t: BacteriaModel(p['A'], p['tau']).w_model(t)),
+    'hiv': (('A', 'alpha', 'B', 'beta'),
+            lambda p, t: HIVModel(p['A'], p['alpha'], p['B'], p['beta']).viral_load(t)),
+}
+
+# Default slider ranges: parameter -> (min, max, lattice points[, 'log']).
+# The curves are linear in the amplitudes A and B, so two points are exact
+# there; the time constants are log-spaced and the rates dense, which keeps
+# the interpolation error below 1 % of the curve's peak.
+DEFAULT_RANGES = {
+    'bacteria_v': {'tau': (0.1, 5.0, 64, 'log')},
+    'bacteria_w': {'A': (0.1, 3.0, 2), 'tau': (0.1, 5.0, 64, 'log')},
+    'hiv': {'A': (0.0, 3e5, 2), 'alpha': (0.0, 2.0, 81), 'B': (0.0, 3e5, 2), 'beta': (0.0, 2.0, 81)},
+}
+
+
+class ParameterLattice:
+    """
+    Model curves precomputed on a regular parameter lattice.
+
+    Parameters:
+        model: Key of MODELS
+        ranges: Dict parameter -> (min, max, number of lattice points) or
+                (min, max, number of lattice points, 'log') for a
+                geometrically spaced axis (min > 0)
+        t: Time points of every curve
+        dtype: Storage type of the precomputed curves
+    """
+
+    def __init__(self, model, ranges, t, dtype=np.float64):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model: {model}")
+        names, func = MODELS[model]
+        if set(ranges) != set(names):
+            raise ValueError(f"{model} needs ranges for {names}")
+        self.model = model
+        self.names = names
+        self.t = np.asarray(t, dtype=float)
+        self.lo = np.array([ranges[n][0] for n in names], dtype=float)
+        self.hi = np.array([ranges[n][1] for n in names], dtype=float)
+        self.size = np.array([ranges[n][2] for n in names])
+        self.log = np.array([len(ranges[n]) > 3 and ranges[n][3] == 'log' for n in names])
+        if np.any(self.size < 2) or np.any(self.hi <= self.lo):
+            raise ValueError("Every range needs max > min and at least two lattice points")
+        if np.any(self.log & (self.lo <= 0)):
+            raise ValueError("Log-spaced ranges need min > 0")
+        # Lattice coordinates are linear in the value, or in its log for 'log' axes
+        self._lo = np.where(self.log, np.log(np.where(self.log, self.lo, 1)), self.lo)
+        self._hi = np.where(self.log, np.log(np.where(self.log, self.hi, 1)), self.hi)
+
+        axes = [self.value(np.linspace(lo, hi, n), i)
+                for i, (lo, hi, n) in enumerate(zip(self._lo, self._hi, self.size))]
+        grids = np.meshgrid(*axes, indexing='ij')
+        params = {name: grid[..., None] for name, grid in zip(names, grids)}
+        self.values = np.ascontiguousarray(func(params, self.t), dtype=dtype)
+        self._corners = np.array(list(product((0, 1), repeat=len(names))))
+
+    def value(self, coord, axis):
+        """Parameter value of a (transformed) coordinate along one axis."""
+        return np.exp(coord) if self.log[axis] else coord
+
+    def fraction(self, params):
+        """
+        Position of a parameter point along every axis, 0 at min and 1 at max.
+
+        Parameters:
+            params: Dict parameter -> value (clipped to the ranges)
+
+        Returns:
+            f: Array of fractions, linear in the value or, for 'log' axes, in its log
+        """
+        try:
+            p = np.array([float(params[n]) for n in self.names])
+        except KeyError as e:
+            raise ValueError(f"Missing parameter {e.args[0]} for {self.model}") from None
+        except (TypeError, ValueError):
+            raise ValueError(f"Parameters of {self.model} must be numbers") from None
+        if not np.all(np.isfinite(p)):
+            raise ValueError(f"Parameters of {self.model} must be finite")
+        p = np.clip(p, self.lo, self.hi)
+        c = np.where(self.log, np.log(np.where(self.log, p, 1)), p)
+        return (c - self._lo) / (self._hi - self._lo)
+
+    def params_at(self, f):
+        """Parameter values at axis fractions f (inverse of fraction)."""
+        coord = self._lo + f * (self._hi - self._lo)
+        return [float(self.value(c, i)) for i, c in enumerate(coord)]
+
+    def position(self, params):
+        """
+        Continuous lattice coordinates of a parameter point (clipped to the lattice).
+
+        Parameters:
+            params: Dict parameter -> value
+
+        Returns:
+            u: Array of coordinates, 0 .. size - 1 per axis
+        """
+        return np.clip(self.fraction(params) * (self.size - 1), 0, self.size - 1)
+
+    def interpolate(self, u):
+        """
+        Multilinear interpolation of the curve at lattice coordinates u.
+
+        Parameters:
+            u: Lattice coordinates (see position)
+
+        Returns:
+            curve: Interpolated curve over t
+        """
+        i0 = np.minimum(np.floor(u).astype(int), self.size - 2)
+        frac = u - i0
+        index = i0 + self._corners
+        weights = np.prod(np.where(self._corners, frac, 1 - frac), axis=1)
+        return weights @ self.values[tuple(index.T)]
+
+
+class ScanService:
+    """
+    Quantize requests and serve interpolated curves from an LRU cache.
+
+    Parameters:
+        lattices: Dict model name -> ParameterLattice
+        levels: Quantization steps along each whole axis (independent of the
+                lattice density, so coarse exactly-linear axes stay precise)
+        cache_size: Maximum number of cached curves
+    """
+
+    def __init__(self, lattices, levels=4096, cache_size=4096):
+        self.lattices = lattices
+        self.levels = levels
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, model, params):
+        """
+        Return the curve for a parameter point.
+
+        Parameters:
+            model: Model name
+            params: Dict parameter -> value
+
+        Returns:
+            curve: Curve over the lattice time points
+            body: JSON-encoded response body (bytes)
+        """
+        lattice = self.lattices.get(model)
+        if lattice is None:
+            raise ValueError(f"Unknown model: {model}")
+        q = np.rint(lattice.fraction(params) * self.levels).astype(int)
+        key = (model,) + tuple(q.tolist())
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        f = q / self.levels
+        curve = lattice.interpolate(f * (lattice.size - 1))
+        body = json.dumps({
+            'model': model,
+            'params': dict(zip(lattice.names, lattice.params_at(f))),
+            'y': curve.tolist(),
+        }).encode()
+        entry = (curve, body)
+        self._cache[key] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return entry
+
+    def curve(self, model, **params):
+        """Convenience wrapper returning only the curve."""
+        return self.lookup(model, params)[0]
+
+
+def build_service(t=None, ranges=None, **kwargs):
+    """
+    Precompute the default lattices for all models.
+
+    Parameters:
+        t: Time points (defaults to np.linspace(0, 10, 100), as in the main() functions)
+        ranges: Dict model -> ranges (defaults to DEFAULT_RANGES)
+        **kwargs: Passed to ScanService
+
+    Returns:
+        service: ScanService instance
+    """
+    t = np.linspace(0, 10, 100) if t is None else t
+    ranges = DEFAULT_RANGES if ranges is None else ranges
+    return ScanService({model: ParameterLattice(model, r, t) for model, r in ranges.items()}, **kwargs)
+
+
+def _response(status, body, keep_alive):
+    reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}[status]
+    head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+def handle_request(service, target):
+    """
+    Answer one request target such as '/curve?model=hiv&A=1&...'.
+
+    Parameters:
+        service: ScanService instance
+        target: Request path with query string
+
+    Returns:
+        status: HTTP status code
+        body: Response body (bytes)
+    """
+    url = urlsplit(target)
+    query = dict(parse_qsl(url.query))
+    if url.path == '/curve':
+        model = query.pop('model', None)
+        try:
+            return 200, service.lookup(model, query)[1]
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}).encode()
+    if url.path == '/models':
+        info = {name: {'params': list(l.names), 't': l.t.tolist()} for name, l in service.lattices.items()}
+        return 200, json.dumps(info).encode()
+    if url.path == '/stats':
+        return 200, json.dumps({'hits': service.hits, 'misses': service.misses,
+                                'cached': len(service._cache)}).encode()
+    return 404, json.dumps({'error': f"Unknown path {url.path}"}).encode()
+
+
+async def _serve_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            keep_alive = True
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                if line.lower().startswith(b'connection:') and b'close' in line.lower():
+                    keep_alive = False
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                status, body = 400, b'{"error": "only GET is supported"}'
+            else:
+                status, body = handle_request(service, parts[1])
+            writer.write(_response(status, body, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, host='127.0.0.1', port=8765):
+    """
+    Start the HTTP interface on the running event loop.
+
+    Parameters:
+        service: ScanService instance
+        host: Interface to bind (local only by default)
+        port: TCP port (0 picks a free one)
+
+    Returns:
+        server: asyncio.Server
+    """
+    return await asyncio.start_server(lambda r, w: _serve_connection(service, r, w), host, port)
+
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description="Serve model curves for interactive parameter scans")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    parser.add_argument('--levels', type=int, default=4096)
+    args = parser.parse_args()
+
+    service = build_service(cache_size=args.cache_size, levels=args.levels)
+
+    async def run():
+        server = await start_server(service, args.host, args.port)
+        print(f"Serving on http://{args.host}:{args.port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
+import tracemalloc
 import unittest
 import numpy as np
-from src.bacteria_model_student import BacteriaModel, load_bacteria_data
+from src.bacteria_model_student import BacteriaModel, BacteriaObjective, load_bacteria_data
 #from solutions.bacteria_model_solution import BacteriaModel, load_bacteria_data
 
 class TestBacteriaModel(unittest.TestCase):
@@ -21,5 +22,43 @@ class TestBacteriaModel(unittest.TestCase):
         self.assertGreater(len(time), 0)
         self.assertGreater(len(response), 0)
 
+    def test_residuals_at_observation_times(self):
+        t, y = load_bacteria_data('data/g149novickA.txt')
+        model = BacteriaModel(A=1.5, tau=1.8)
+        r = model.residuals(t, y, model_type='v')
+        np.testing.assert_allclose(r, model.v_model(t) - y)
+        self.assertAlmostEqual(model.sse(t, y, 'v'), float(np.sum(r ** 2)))
+        with self.assertRaises(ValueError):
+            model.residuals(t, y, model_type='x')
+
+    def test_objective_gradient(self):
+        t, y = load_bacteria_data('data/g149novickA.txt')
+        weights = np.arange(len(t)) % 3 != 0
+        for model_type, params in (('v', [1.7]), ('w', [1.2, 1.6])):
+            objective = BacteriaObjective(t, y, model_type, weights=weights)
+            A, tau = (1.0, params[0]) if model_type == 'v' else params
+            expected = BacteriaModel(A, tau).sse(t[weights], y[weights], model_type)
+            value, grad = objective.value_and_grad(params)
+            grad = grad.copy()
+            self.assertAlmostEqual(value, expected)
+            for i in range(len(params)):
+                hi, lo = np.array(params, dtype=float), np.array(params, dtype=float)
+                hi[i] += 1e-6
+                lo[i] -= 1e-6
+                self.assertAlmostEqual(grad[i], (objective(hi) - objective(lo)) / 2e-6, places=4)
+            jac = objective.jacobian(params)
+            np.testing.assert_allclose(2 * jac.T @ (weights * objective.residuals(params)), grad)
+
+    def test_objective_does_not_allocate(self):
+        t = np.linspace(0, 10, 10000)
+        objective = BacteriaObjective(t, np.zeros_like(t), 'w')
+        objective.value_and_grad([1.0, 2.0])
+        tracemalloc.start()
+        for tau in np.linspace(1, 3, 50):
+            objective.value_and_grad([1.0, tau])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, t.nbytes)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""
+测试性能基准套件
+"""
+
+import json
+import pytest
+from src.benchmark_suite import run_benchmarks, compare, main
+
+def _report(**times):
+    return {'meta': {}, 'results': {name: {'min': t, 'median': t} for name, t in times.items()}}
+
+def test_compare_detects_regression():
+    """测试超过阈值的变慢被判定为回归"""
+    rows, regressed = compare(_report(a=1.0, b=1.0), _report(a=1.05, b=1.5, c=9.0), threshold=0.1)
+    status = {row[0]: row[4] for row in rows}
+    assert status == {'a': 'ok', 'b': 'SLOWER', 'c': 'new'}
+    assert regressed
+    rows, regressed = compare(_report(a=1.0), _report(a=0.5), threshold=0.1)
+    assert rows[0][4] == 'faster' and not regressed
+
+def test_compare_reports_missing():
+    """测试当前结果中缺失的基准被报告，并默认判为失败"""
+    rows, regressed = compare(_report(a=1.0, b=1.0), _report(a=1.0))
+    assert rows[1] == ('b', 1.0, None, None, 'MISSING')
+    assert regressed, "缺失基准默认应失败"
+    rows, regressed = compare(_report(a=1.0, b=1.0), _report(a=1.0), allow_missing=True)
+    assert rows[1][4] == 'MISSING' and not regressed
+
+def test_run_and_compare_cli(tmp_path):
+    """测试运行基准并通过命令行比较"""
+    report = run_benchmarks(sizes=('small',), repeat=1, name_filter='calculate_parameters')
+    assert list(report['results']) == ['calculate_parameters[small]']
+    assert report['results']['calculate_parameters[small]']['min'] > 0
+
+    baseline = tmp_path / "base.json"
+    current = tmp_path / "cur.json"
+    baseline.write_text(json.dumps(_report(x=1.0)))
+    current.write_text(json.dumps(_report(x=2.0)))
+    assert main(['compare', str(baseline), str(current), '--threshold', '0.5']) == 1
+    assert main(['compare', str(baseline), str(baseline)]) == 0
+    current.write_text(json.dumps(_report(y=1.0)))
+    assert main(['compare', str(baseline), str(current)]) == 1
+    assert main(['compare', str(baseline), str(current), '--allow-missing']) == 0
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,59 @@
+"""
+测试耦合映射格子
+"""
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.logistic_map_student import iterate_logistic
+from src.coupled_lattice import CoupledMapLattice, plot_lattice
+
+def test_uncoupled_sites_follow_logistic():
+    """测试eps=0时每个格点独立按Logistic映射演化"""
+    x0 = np.array([0.1, 0.2, 0.3, 0.4])
+    lattice = CoupledMapLattice(4, r=3.7, eps=0.0, x0=x0)
+    lattice.run(20)
+    expected = [iterate_logistic(3.7, v, 21)[-1] for v in x0]
+    assert np.allclose(lattice.state, expected)
+
+def test_coupling_matches_roll():
+    """测试一维与二维耦合更新与np.roll实现一致"""
+    rng = np.random.default_rng(0)
+    for shape in (7, (5, 6)):
+        x0 = rng.uniform(0, 1, shape)
+        lattice = CoupledMapLattice(shape, r=3.9, eps=0.3, x0=x0)
+        lattice.step()
+        f = 3.9 * x0 * (1 - x0)
+        axes = range(f.ndim)
+        neighbours = sum(np.roll(f, s, axis=a) for a in axes for s in (1, -1))
+        expected = 0.7 * f + 0.3 / (2 * f.ndim) * neighbours
+        assert np.allclose(lattice.state, expected)
+
+def test_snapshots_and_rate(tmp_path):
+    """测试快照抽取与每秒格点更新数"""
+    path = str(tmp_path / "snap.npy")
+    lattice = CoupledMapLattice((16, 16), r=3.9, eps=0.2, seed=1)
+    stats = lattice.run(10, snapshot_every=3, snapshot_path=path)
+    snaps = np.load(path)
+    assert snaps.shape == (3, 16, 16)
+    assert stats['snapshots'] == 3
+    assert stats['site_updates_per_second'] > 0
+    assert np.all((lattice.state >= 0) & (lattice.state <= 1))
+
+def test_invalid_arguments():
+    """测试无效参数"""
+    with pytest.raises(ValueError):
+        CoupledMapLattice((2, 2, 2), 3.9, 0.1)
+    with pytest.raises(ValueError):
+        CoupledMapLattice(4, 3.9, 1.5)
+    with pytest.raises(ValueError):
+        CoupledMapLattice(4, 3.9, 0.1).run(5, snapshot_every=1)
+
+def test_plot_lattice():
+    """测试绘图函数"""
+    fig = plot_lattice(np.random.rand(10, 10), title='CML')
+    assert isinstance(fig, plt.Figure)
+    plt.close(fig)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,75 @@
+"""
+测试初值敏感性（轨道分离）分析
+"""
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.logistic_map_student import iterate_logistic
+from src.divergence import divergence_analysis, plot_divergence
+from src.map_engine import GAUSS
+
+def test_matches_pairwise_iteration():
+    """测试集合计算与逐对调用iterate_logistic一致"""
+    r = np.array([3.2, 3.7, 4.0])
+    deltas = np.array([1e-10, 1e-6])
+    result = divergence_analysis(r, deltas, x0=0.3, n=200, threshold=0.2)
+    assert result['log_separation'].shape == (201, 3, 2)
+    for i, ri in enumerate(r):
+        x = iterate_logistic(ri, 0.3, 201)
+        for j, d in enumerate(deltas):
+            sep = np.abs(iterate_logistic(ri, 0.3 + d, 201) - x)
+            with np.errstate(divide='ignore'):
+                assert np.array_equal(result['log_separation'][:, i, j], np.log(sep))
+            above = np.nonzero(sep > 0.2)[0]
+            assert result['decorrelation_time'][i, j] == (above[0] if len(above) else -1)
+
+def test_chaos_and_periodic():
+    """测试混沌区的分离按ln2增长，周期区不发生退相关"""
+    result = divergence_analysis([3.2, 4.0], [1e-12], x0=0.3, n=500, n_discard=100, record=False)
+    assert result['log_separation'] is None
+    t_dec = result['decorrelation_time']
+    assert t_dec[0, 0] == -1
+    assert 20 < t_dec[1, 0] < 60
+    assert result['growth_rate'][1, 0] == pytest.approx(np.log(2), rel=0.2)
+    assert np.isnan(result['growth_rate'][0, 0])
+
+def test_default_x0_is_generic():
+    """测试默认初值不落在不动点的原像上（x0=0.5在r=4时经1落到0）"""
+    result = divergence_analysis([4.0], [1e-10], n=100)
+    assert np.all(np.isfinite(result['log_separation'][1:]))
+    assert result['decorrelation_time'][0, 0] > 0
+
+def test_decimate_and_plot():
+    """测试抽样记录与绘图"""
+    r = np.linspace(3.5, 4.0, 20)
+    deltas = [1e-9, 1e-5]
+    result = divergence_analysis(r, deltas, n=100, decimate=10)
+    assert list(result['steps']) == list(range(0, 101, 10))
+    assert result['log_separation'].shape == (11, 20, 2)
+    fig = plot_divergence(result, r, deltas)
+    assert len(fig.axes) == 2
+    plt.close(fig)
+    with pytest.raises(ValueError):
+        divergence_analysis(r, [0.0])
+    with pytest.raises(ValueError):
+        divergence_analysis(r, deltas, decimate=0)
+    with pytest.raises(ValueError):
+        divergence_analysis(r, deltas, map_name='unknown')
+
+def test_multi_parameter_map():
+    """测试多参数映射（Gauss映射）通过other_params传入其余参数"""
+    beta = np.array([-0.8, -0.3])
+    result = divergence_analysis(beta, [1e-8], x0=0.0, n=50, map_name='gauss', other_params=(6.2,))
+    x = np.empty(51)
+    y = np.empty(51)
+    x[0], y[0] = 0.0, 1e-8
+    for j, b in enumerate(beta):
+        for i in range(50):
+            x[i + 1] = GAUSS.func(x[i], b, 6.2)
+            y[i + 1] = GAUSS.func(y[i], b, 6.2)
+        with np.errstate(divide='ignore'):
+            assert np.allclose(result['log_separation'][:, j, 0], np.log(np.abs(y - x)))
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,61 @@
+"""
+测试异步图像导出
+"""
+
+import os
+import pytest
+import matplotlib
+from src.figure_export import FigureExporter
+
+def _make_figure(value):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.plot([0, 1], [0, value])
+    return fig
+
+def test_exporter_writes_files(tmp_path):
+    """测试后台保存所有图像并强制使用非交互后端"""
+    paths = [str(tmp_path / "sub" / f"fig{i}.png") for i in range(4)]
+    with FigureExporter(max_workers=2, dpi=50) as exporter:
+        assert matplotlib.get_backend().lower() == "agg"
+        for i, path in enumerate(paths):
+            exporter.submit(_make_figure(i), path)
+    for path in paths:
+        assert os.path.getsize(path) > 0, "图像文件应已写入"
+
+def test_flush_returns_paths_and_raises(tmp_path):
+    """测试flush返回路径，并在保存失败时抛出异常"""
+    exporter = FigureExporter(max_workers=1, dpi=50)
+    path = str(tmp_path / "a.png")
+    exporter.submit(_make_figure(1), path)
+    assert exporter.flush() == [path]
+
+    exporter.submit(_make_figure(1), str(tmp_path / "bad.unknownformat"))
+    with pytest.raises(ValueError):
+        exporter.flush()
+    exporter.close()
+
+def test_process_mode_matches_serial(tmp_path):
+    """测试进程模式（图像经pickle传给子进程）保存的图像与直接保存的一致"""
+    import matplotlib.image as mpimg
+    import matplotlib.pyplot as plt
+
+    paths = [str(tmp_path / "process" / f"fig{i}.png") for i in range(3)]
+    with FigureExporter(max_workers=2, mode='process', dpi=50) as exporter:
+        for i, path in enumerate(paths):
+            exporter.submit(_make_figure(i), path)
+    for i, path in enumerate(paths):
+        serial = str(tmp_path / f"serial{i}.png")
+        fig = _make_figure(i)
+        fig.savefig(serial, dpi=50)
+        plt.close(fig)
+        assert os.path.getsize(path) > 0, "图像文件应已写入"
+        assert (mpimg.imread(path) == mpimg.imread(serial)).all(), "进程模式的输出应与直接保存一致"
+
+def test_invalid_mode():
+    """测试无效模式"""
+    with pytest.raises(ValueError):
+        FigureExporter(mode="gpu")
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,55 @@
+"""
+测试可复用图像模板
+"""
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.figure_templates import SeriesCanvas, plot_small_multiples, benchmark_figures_per_second
+from src.logistic_map_student import plot_time_series
+from src.bacteria_model_student import BacteriaModel, plot_models_and_data
+
+def test_canvas_reuses_figure():
+    """测试原地更新曲线而不新建图像"""
+    canvas = SeriesCanvas(xlabel='Iteration', ylabel='x')
+    fig1 = plot_time_series(3.2, 0.5, 50, canvas=canvas)
+    fig2 = plot_time_series(3.6, 0.5, 80, canvas=canvas)
+    assert fig1 is fig2, "应复用同一个图像"
+    ax = fig2.get_axes()[0]
+    assert len(ax.get_lines()) == 1
+    assert len(ax.get_lines()[0].get_xdata()) == 80
+    assert "3.6" in ax.get_title()
+    canvas.close()
+
+def test_canvas_multiple_lines_and_points(tmp_path):
+    """测试多条曲线与实验数据点"""
+    canvas = SeriesCanvas(n_lines=2, points=True)
+    models = [BacteriaModel(1.0, 1.0), BacteriaModel(2.0, 1.0)]
+    t = np.linspace(0, 2, 20)
+    path = tmp_path / "results" / "w.png"
+    fig = plot_models_and_data(models, t, t, t, title='W', model_type='w', save_path=str(path), canvas=canvas)
+    assert path.exists()
+    lines = fig.get_axes()[0].get_lines()
+    assert np.allclose(lines[1].get_ydata(), models[1].w_model(t))
+    with pytest.raises(ValueError):
+        canvas.update(t, [t])
+    with pytest.raises(ValueError):
+        plot_models_and_data(models, t, save_path=str(path), canvas=canvas, exporter=object())
+    canvas.close()
+
+def test_small_multiples():
+    """测试小图网格"""
+    x = np.arange(10)
+    fig = plot_small_multiples([(x, x * i, f"{i}") for i in range(5)], ncols=2)
+    visible = [ax for ax in fig.get_axes() if ax.get_visible()]
+    assert len(visible) == 5
+    plt.close(fig)
+
+def test_benchmark():
+    """测试基准测试返回每秒图像数"""
+    result = benchmark_figures_per_second(n_series=3, n_points=10, dpi=20)
+    assert set(result) == {'fresh', 'canvas', 'small_multiples'}
+    assert all(rate > 0 for rate in result.values())
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -1,6 +1,7 @@
+import tracemalloc
 import unittest
 import numpy as np
-from src.hiv_model_student import HIVModel, load_hiv_data
+from src.hiv_model_student import HIVModel, HIVObjective, load_hiv_data
 #from solutions.hiv_model_solution import HIVModel, load_hiv_data
 
 class TestHIVModel(unittest.TestCase):
@@ -19,5 +20,39 @@ class TestHIVModel(unittest.TestCase):
         self.assertGreater(len(time), 0)
         self.assertGreater(len(load), 0)
 
+    def test_residuals_at_observation_times(self):
+        time, load = load_hiv_data('data/HIVseries.csv')
+        model = HIVModel(A=175000, alpha=0.6, B=0, beta=0)
+        np.testing.assert_allclose(model.residuals(time, load), model.viral_load(time) - load)
+        self.assertAlmostEqual(model.sse(time, load), float(np.sum((model.viral_load(time) - load) ** 2)))
+
+    def test_objective_gradient(self):
+        time, load = load_hiv_data('data/HIVseries.csv')
+        for terms, params in ((1, [1.5e5, 0.5]), (2, [1.5e5, 0.5, 2e4, 0.05])):
+            objective = HIVObjective(time, load, terms=terms)
+            value, grad = objective.value_and_grad(params)
+            grad = grad.copy()
+            A, alpha, B, beta = (params + [0, 0])[:4]
+            self.assertAlmostEqual(value / HIVModel(A, alpha, B, beta).sse(time, load), 1.0)
+            for i in range(len(params)):
+                step = np.array(params, dtype=float)
+                h = 1e-6 * max(abs(step[i]), 1.0)
+                step[i] += h
+                self.assertAlmostEqual(grad[i] / ((objective(step) - value) / h), 1.0, places=3)
+            np.testing.assert_allclose(2 * objective.jacobian(params).T @ objective.residuals(params), grad)
+        with self.assertRaises(ValueError):
+            HIVObjective(time, load, terms=3)
+
+    def test_objective_does_not_allocate(self):
+        time = np.linspace(0, 10, 10000)
+        objective = HIVObjective(time, np.zeros_like(time))
+        objective.value_and_grad([1.0, 0.5, 1.0, 0.1])
+        tracemalloc.start()
+        for alpha in np.linspace(0.1, 1, 50):
+            objective.value_and_grad([1.0, alpha, 1.0, 0.1])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, time.nbytes)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+测试纯计算用途的导入不加载matplotlib且导入时间在预算内
+"""
+
+import os
+import pytest
+from src.import_benchmark import check_budget, measure_import, COMPUTE_MODULES
+
+# CI机器较慢时可通过环境变量放宽预算
+BUDGET_MS = float(os.environ.get('CP_IMPORT_BUDGET_MS', 1000))
+
+def test_compute_imports_within_budget():
+    """测试所有计算模块导入不加载matplotlib且不超过预算"""
+    for result in check_budget(COMPUTE_MODULES, BUDGET_MS):
+        assert not result['matplotlib'], f"{result['module']} 不应导入matplotlib"
+        assert result['total_ms'] <= BUDGET_MS, f"{result['module']} 导入耗时 {result['total_ms']:.0f} ms"
+
+def test_plotting_module_detected():
+    """测试能检测到导入了matplotlib的模块"""
+    assert measure_import('src.figure_templates')['matplotlib']
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,105 @@
+"""
+测试阶段计时与性能分析钩子
+"""
+
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from src import instrumentation
+from src.instrumentation import stage, count, tracing, summary
+from src.logistic_map_student import iterate_logistic
+from src.millikan_fit_student import calculate_parameters, load_data
+from src.bacteria_model_student import load_bacteria_data
+from src.hiv_model_student import load_hiv_data
+from src.figure_export import FigureExporter
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+def test_disabled_is_noop():
+    """测试关闭时不记录任何事件"""
+    instrumentation.reset()
+    assert not instrumentation.is_enabled()
+    with stage('x.y'):
+        pass
+    count('c')
+    assert instrumentation.events() == []
+    assert stage('a') is stage('b'), "关闭时应返回共享的空上下文"
+
+def test_tracing_records_module_stages(tmp_path):
+    """测试各模块阶段被记录并导出为Chrome trace"""
+    path = str(tmp_path / "trace.json")
+    with tracing(path, profile=['millikan.fit'], memory=['logistic.iterate']):
+        iterate_logistic(3.9, 0.3, 1000)
+        calculate_parameters(np.arange(5.0), np.arange(5.0) * 2)
+        count('points', 5)
+    with open(path) as f:
+        trace = json.load(f)
+    names = {e['name'] for e in trace['traceEvents'] if e['ph'] == 'X'}
+    assert {'logistic.iterate', 'millikan.fit'} <= names
+    events = {e['name']: e for e in trace['traceEvents'] if e['ph'] == 'X'}
+    assert os.path.exists(events['millikan.fit']['args']['profile'])
+    assert events['logistic.iterate']['args']['peak_kb'] > 0
+    assert trace['otherData']['counters'] == {'points': 5, 'logistic.iterations': 1000}
+    assert summary()['logistic.iterate']['calls'] == 1
+    assert not instrumentation.is_enabled()
+
+def test_module_counters(tmp_path):
+    """测试迭代次数、读入数据点数与保存图像数的计数器"""
+    import matplotlib.pyplot as plt
+
+    with tracing(str(tmp_path / "trace.json")):
+        iterate_logistic(np.array([3.2, 3.9]), 0.3, 100)
+        x, _ = load_data(os.path.join(DATA_DIR, 'millikan.txt'))
+        t, _ = load_bacteria_data(os.path.join(DATA_DIR, 'g149novickA.txt'))
+        th, _ = load_hiv_data(os.path.join(DATA_DIR, 'HIVseries.csv'))
+        with FigureExporter() as exporter:
+            exporter.submit(plt.figure(), str(tmp_path / "a.png"), dpi=50)
+            exporter.submit(plt.figure(), str(tmp_path / "b.png"), dpi=50)
+        counters = instrumentation.counters()
+    assert counters == {'logistic.iterations': 200, 'millikan.points': len(x), 'bacteria.points': len(t),
+                        'hiv.points': len(th), 'export.figures': 2}
+
+def test_environment_variable(tmp_path):
+    """测试通过环境变量开启并在退出时写出"""
+    path = str(tmp_path / "env.json")
+    env = dict(os.environ, CP_TRACE=path)
+    env.pop('CP_TRACE_ROOT_PID', None)
+    code = "from src.logistic_map_student import iterate_logistic; iterate_logistic(3.9, 0.3, 10)"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                   cwd=os.path.join(os.path.dirname(__file__), '..'))
+    with open(path) as f:
+        trace = json.load(f)
+    assert any(e['name'] == 'logistic.iterate' for e in trace['traceEvents'])
+
+def test_process_pool_trace(tmp_path):
+    """测试进程池工作进程的事件被写出，并在主进程导入本模块时合并到主trace"""
+    root = os.path.join(os.path.dirname(__file__), '..')
+    task = "from src.logistic_map_student import iterate_logistic; iterate_logistic(3.9, 0.3, 10)"
+    for parent_imports in (False, True):
+        path = tmp_path / f"{parent_imports}" / "trace.json"
+        env = dict(os.environ, CP_TRACE=str(path))
+        env.pop('CP_TRACE_ROOT_PID', None)
+        code = ("import src.instrumentation\n" if parent_imports else "") + (
+            "from concurrent.futures import ProcessPoolExecutor\n"
+            "with ProcessPoolExecutor(2) as executor:\n"
+            f"    list(executor.map(exec, [{task!r}] * 4))\n")
+        subprocess.run([sys.executable, "-c", code], env=env, check=True, cwd=root)
+        workers = [name for name in os.listdir(path.parent) if name != 'trace.json']
+        assert workers, "工作进程应写出自己的trace文件"
+        for name in workers:
+            with open(path.parent / name) as f:
+                assert any(e['name'] == 'logistic.iterate' for e in json.load(f)['traceEvents'])
+        if parent_imports:
+            with open(path) as f:
+                trace = json.load(f)
+            assert sum(e['name'] == 'logistic.iterate' for e in trace['traceEvents']) == 4
+            assert trace['otherData']['counters'] == {'logistic.iterations': 40}
+            assert trace['otherData']['summary']['logistic.iterate']['calls'] == 4
+        else:
+            assert not path.exists()
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,78 @@
+"""
+测试Logistic映射周期轨道的解析快速路径
+"""
+
+import numpy as np
+import pytest
+from src.logistic_cycles import attracting_cycles, cycle_polynomial
+from src import map_engine
+from src.map_engine import LOGISTIC
+
+def test_closed_forms():
+    """测试不动点与2周期点的解析解"""
+    period, points = attracting_cycles(0.5, [0.5, 2.5, 3.2])
+    assert list(period) == [1, 1, 2]
+    assert points[0, 0] == 0.0
+    assert points[0, 1] == pytest.approx(1 - 1 / 2.5)
+    r = 3.2
+    x = points[:2, 2]
+    assert np.allclose(r * x * (1 - x), x[::-1])
+
+def test_cycle_polynomial_roots():
+    """测试f^n(x)-x多项式的根确为周期点"""
+    r = np.array([3.3, 3.9])
+    coeffs = cycle_polynomial(r, 2)
+    assert coeffs.shape == (2, 4)
+    for j in range(2):
+        for x in np.roots(coeffs[j, ::-1]):
+            if abs(x.imag) < 1e-9:
+                y = x.real
+                for _ in range(2):
+                    y = r[j] * y * (1 - y)
+                assert y == pytest.approx(x.real, abs=1e-9)
+
+def test_windows_match_iteration():
+    """测试周期4与周期3窗口内的吸引环与长时间迭代一致，混沌区不解析"""
+    r = np.array([3.5, 3.835, 3.9604, 3.7, 3.0])
+    period, points = attracting_cycles(0.5, r)
+    assert list(period) == [4, 3, 4, 0, 0], "混沌区和中性稳定的r应回退到迭代"
+    x = LOGISTIC.transient((r[:3],), 0.5, 100000)
+    for j in range(3):
+        orbit = LOGISTIC.iterate((r[j],), x[j], period[j] + 1)[1:]
+        assert np.allclose(np.sort(orbit), np.sort(points[:period[j], j]), atol=1e-8)
+    assert np.all(attracting_cycles(0.0, r)[0] == 0), "x0=0停留在不动点0"
+    period = attracting_cycles(0.5, r, n_steps=1000)[0]
+    assert list(period) == [0, 0, 0, 0, 0], "迭代步数少时求根比迭代更慢，应跳过周期3和4"
+    assert list(attracting_cycles(0.5, [2.5, 3.2], n_steps=10)[0]) == [1, 2]
+
+def test_bifurcation_fast_path():
+    """测试分岔图的解析快速路径与迭代结果一致"""
+    r_fast, x_fast = LOGISTIC.bifurcation(2.8, 4.0, 300, 6000, 5800)
+    r_iter, x_iter = LOGISTIC.bifurcation(2.8, 4.0, 300, 6000, 5800, analytic=False)
+    assert np.array_equal(r_fast, r_iter)
+    x_fast, x_iter = x_fast.reshape(200, 300), x_iter.reshape(200, 300)
+    period = attracting_cycles(0.5, np.linspace(2.8, 4.0, 300), n_steps=6000)[0]
+    resolved = period > 0
+    assert resolved.sum() > 100
+    assert np.array_equal(x_fast[:, ~resolved], x_iter[:, ~resolved])
+    # 分岔点附近迭代收敛很慢，用很长的暂态作对照
+    x_long = LOGISTIC.bifurcation(2.8, 4.0, 300, 100012, 100000, analytic=False)[1].reshape(12, 300)
+    assert np.allclose(np.sort(x_fast[:12, resolved], axis=0), np.sort(x_long[:, resolved], axis=0), atol=1e-8)
+    assert LOGISTIC.bifurcation(2.8, 4.0, 300, 1200, 1000, dtype=np.float32)[1].dtype == np.float32
+
+def test_analytic_only_for_long_transients(monkeypatch):
+    """测试暂态较短时直接迭代，并测试按连续区间写入与整体写入的结果一致"""
+    args = (2.5, 4.0, 100, 300, 100)
+    map_engine.clear_cache()
+    fast, iterated = LOGISTIC.bifurcation(*args)[1], LOGISTIC.bifurcation(*args, analytic=False)[1]
+    assert np.array_equal(fast, iterated), "n_p * n_discard 较小时不应使用解析快速路径"
+    monkeypatch.setattr(map_engine, 'ANALYTIC_MIN_WORK', 0)
+    map_engine.clear_cache()
+    by_runs = LOGISTIC.bifurcation(*args)[1]
+    monkeypatch.setattr(map_engine, '_MAX_RUNS', 0)
+    map_engine.clear_cache()
+    assert np.array_equal(by_runs, LOGISTIC.bifurcation(*args)[1])
+    map_engine.clear_cache()
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,45 @@
+"""
+测试不变密度的流式估计
+"""
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.logistic_density import invariant_density, analytic_invariant_density, compare_with_analytic, plot_invariant_density
+
+def test_density_matches_analytic():
+    """测试r=4时估计值与解析密度一致"""
+    x0 = np.random.default_rng(1).uniform(0.05, 0.95, 500)
+    edges, density = invariant_density(4.0, x0, 2000, bins=50, block=256)
+    assert np.isclose(np.sum(density * np.diff(edges)), 1.0)
+    l1_error, expected = compare_with_analytic(edges, density)
+    assert l1_error < 0.05, "应接近解析密度"
+
+def test_density_periodic():
+    """测试周期2时密度集中在两个格子中"""
+    edges, density = invariant_density(3.2, 0.5, 1000, bins=100, block=64)
+    assert np.count_nonzero(density) == 2
+
+def test_single_orbit_matches_ensemble():
+    """测试单条轨道（标量快速路径）与数组路径的结果一致"""
+    edges, single = invariant_density(4.0, 0.3, 5000, bins=40, n_discard=10, block=700)
+    _, pair = invariant_density(4.0, [0.3, 0.3], 5000, bins=40, n_discard=10, block=700)
+    assert np.array_equal(single, pair)
+
+def test_analytic_density():
+    """测试解析密度的对称性"""
+    x = np.array([0.1, 0.9])
+    rho = analytic_invariant_density(x)
+    assert np.isclose(rho[0], rho[1])
+    with pytest.raises(ValueError):
+        invariant_density(4.0, 0.3, 0)
+
+def test_plot_invariant_density():
+    """测试绘图函数"""
+    edges, density = invariant_density(4.0, [0.2, 0.3], 1000, bins=20)
+    fig = plot_invariant_density(edges, density, r=4.0)
+    assert isinstance(fig, plt.Figure)
+    plt.close(fig)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,45 @@
+"""
+测试回归映射与蛛网图
+"""
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.logistic_map_student import iterate_logistic
+from src.logistic_return_map import return_map_points, cobweb_segments, plot_return_map, plot_cobweb
+
+def test_return_map_points_bounded():
+    """测试量化后的点数受网格大小限制，且点落在映射曲线上"""
+    r = 3.9
+    x = iterate_logistic(r, 0.3, 200000)
+    xn, xn1 = return_map_points(x, bins=256)
+    assert len(xn) <= 256 * 256
+    assert len(xn) < len(x) // 10, "应大幅减少点数"
+    assert np.max(np.abs(xn1 - r * xn * (1 - xn))) < 0.05
+
+def test_return_map_periodic_orbit():
+    """测试周期2轨道只剩两个点"""
+    x = iterate_logistic(3.2, 0.5, 2000)[1000:]
+    xn, xn1, counts = return_map_points(x, bins=1000, method='density')
+    assert len(xn) == 2
+    assert counts.sum() == len(x) - 1
+
+def test_cobweb_segments():
+    """测试蛛网图线段形状"""
+    x = iterate_logistic(3.2, 0.5, 2000)[1000:]
+    segments = cobweb_segments(x, bins=1000)
+    assert segments.shape == (4, 2, 2)
+    with pytest.raises(ValueError):
+        cobweb_segments(np.array([0.5]))
+
+def test_plots():
+    """测试绘图函数"""
+    for fig in (plot_return_map(3.9, 0.3, 5000, 100),
+                plot_return_map(3.9, 0.3, 5000, 100, method='density'),
+                plot_cobweb(3.9, 0.3, 5000, 100)):
+        assert isinstance(fig, plt.Figure)
+        assert fig.get_axes()[0].get_xlabel() != ""
+        plt.close(fig)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
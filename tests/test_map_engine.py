@@ -0,0 +1,81 @@
+"""
+测试一维映射引擎
+"""
+
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from src.map_engine import OneDMap, LOGISTIC, TENT, SINE, GAUSS, MAPS, clear_cache
+from src.logistic_map_student import iterate_logistic
+
+def test_iterate_scalar_and_batched():
+    """测试单轨道与批量迭代结果一致"""
+    r = np.array([2.0, 3.2, 3.9])
+    batched = LOGISTIC.iterate(r, 0.5, 50)
+    assert batched.shape == (50, 3)
+    for i, r_val in enumerate(r):
+        assert np.allclose(batched[:, i], iterate_logistic(r_val, 0.5, 50))
+
+def test_custom_map():
+    """测试自定义映射"""
+    doubling = OneDMap('doubling', lambda x, a: (a * x) % 1.0, lambda x, a: a + 0 * x)
+    x = doubling.iterate(2.0, 0.125, 4)
+    assert np.allclose(x, [0.125, 0.25, 0.5, 0.0])
+    assert np.isclose(doubling.lyapunov(2.0, 0.1, 100, 0), np.log(2))
+
+def test_bifurcation_cached():
+    """测试分岔数据的形状与缓存"""
+    clear_cache()
+    p, x = LOGISTIC.bifurcation(2.8, 3.2, 10, 60, 50)
+    assert p.shape == x.shape == (100,)
+    assert not x.flags.writeable
+    p2, x2 = LOGISTIC.bifurcation(2.8, 3.2, 10, 60, 50)
+    assert x2 is x, "相同参数应命中缓存"
+
+def test_lyapunov_known_values():
+    """测试已知的Lyapunov指数"""
+    assert np.isclose(LOGISTIC.lyapunov(4.0, 0.3, 20000), np.log(2), atol=0.02)
+    assert LOGISTIC.lyapunov(2.5, 0.3, 1000) < 0
+    assert np.isclose(TENT.lyapunov(1.5, 0.3, 100), np.log(1.5))
+    p, lam = SINE.lyapunov_curve(0.5, 1.0, 5, n=500)
+    assert lam.shape == (5,)
+
+def test_all_maps_iterate():
+    """测试所有内置映射均可批量迭代"""
+    for m in MAPS.values():
+        params = (np.array([0.5, 0.6]), 6.0) if m is GAUSS else np.array([1.2, 1.5])
+        x = m.iterate(params, None, 20)
+        assert x.shape == (20, 2)
+        assert np.all(np.isfinite(x))
+    with pytest.raises(ValueError):
+        OneDMap('no_derivative', lambda x, a: a * x).lyapunov(0.5)
+
+def test_logistic_scalar_fast_path(monkeypatch):
+    """测试Logistic单轨道走内联循环，且结果与数组路径一致"""
+    calls = []
+    inline = LOGISTIC.scalar_iterate
+    monkeypatch.setattr(LOGISTIC, 'scalar_iterate', lambda *args: calls.append(args) or inline(*args))
+    x = iterate_logistic(3.9, 0.3, 1000)
+    assert len(calls) == 1, "标量float64输入应走内联循环"
+    assert np.array_equal(x, LOGISTIC.iterate(np.array([3.9]), 0.3, 1000)[:, 0])
+    LOGISTIC.iterate(np.array([3.9, 3.7]), 0.3, 10)
+    assert len(calls) == 1, "数组输入应走向量化路径"
+
+def test_float32_single_orbit():
+    """测试float32单轨道走标量循环，并与数组路径逐位一致"""
+    for m in MAPS.values():
+        params = (0.5, 6.0) if m is GAUSS else (1.2,)
+        single = m.iterate(params, None, 50, dtype=np.float32)
+        batched = m.iterate(tuple(np.array([p]) for p in params), None, 50, dtype=np.float32)[:, 0]
+        assert single.dtype == np.float32
+        assert np.array_equal(single, batched), m.name
+
+def test_engine_does_not_import_cycles():
+    """测试通用映射引擎在用到前不导入Logistic周期求解模块"""
+    code = "import sys, src.map_engine; assert 'src.logistic_cycles' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=os.path.join(os.path.dirname(__file__), '..'))
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
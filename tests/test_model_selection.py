@@ -0,0 +1,51 @@
+"""
+测试模型选择工具
+"""
+
+import numpy as np
+import pytest
+from src.bacteria_model_student import BacteriaModel
+from src.hiv_model_student import HIVModel
+from src.model_selection import fold_masks, fit_candidate, select_models, select_directory, format_table
+
+def test_fold_masks():
+    """测试k折掩码：每个点恰好被留出一次"""
+    train = fold_masks(17, 5, seed=1)
+    assert train.shape == (5, 17)
+    assert np.all((~train).sum(axis=0) == 1)
+    assert fold_masks(3, 10).shape == (3, 3)
+
+def test_fit_recovers_parameters():
+    """测试拟合能恢复合成数据的参数"""
+    t = np.linspace(0.2, 8, 25)
+    row = fit_candidate('bacteria', 'w', t, BacteriaModel(1.3, 2.1).w_model(t))
+    assert np.allclose(row['params'], [1.3, 2.1], rtol=1e-4)
+    y = HIVModel(1.5e5, 0.7, 2e4, 0.05).viral_load(t)
+    row = fit_candidate('hiv', 'double', t, y)
+    assert np.allclose(row['params'], [1.5e5, 0.7, 2e4, 0.05], rtol=1e-3)
+    with pytest.raises(ValueError):
+        fit_candidate('hiv', 'triple', t, y)
+
+def test_select_models_prefers_true_model():
+    """测试信息准则与交叉验证选择生成数据的模型"""
+    rng = np.random.default_rng(0)
+    t = np.linspace(0.2, 8, 30)
+    datasets = {
+        'w_data': ('bacteria', t, BacteriaModel(1.0, 1.5).w_model(t) + rng.normal(0, 0.02, t.size)),
+        'v_data': ('bacteria', t, BacteriaModel(1.0, 1.5).v_model(t) + rng.normal(0, 0.02, t.size)),
+    }
+    rows = select_models(datasets, k=5, max_workers=1)
+    best = {row['dataset']: row['model'] for row in rows if row['best_bic']}
+    assert best == {'w_data': 'w', 'v_data': 'v'}
+    assert all(row['best_cv_mse'] == row['best_bic'] for row in rows)
+
+def test_select_directory():
+    """测试对data目录的并行模型选择"""
+    rows = select_directory('data', k=4, max_workers=2)
+    assert {row['dataset'] for row in rows} == {'HIVseries.csv', 'g149novickA.txt', 'g149novickB.txt'}
+    assert len(rows) == 6
+    table = format_table(rows)
+    assert table.count("\n") == len(rows) + 1
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
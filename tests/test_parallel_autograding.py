@@ -0,0 +1,84 @@
+"""
+测试并行自动评分脚本
+"""
+
+import importlib.util
+import json
+import os
+import sys
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      '.github', 'classroom', 'parallel_autograding.py')
+spec = importlib.util.spec_from_file_location('parallel_autograding', SCRIPT)
+parallel_autograding = importlib.util.module_from_spec(spec)
+sys.modules['parallel_autograding'] = parallel_autograding
+spec.loader.exec_module(parallel_autograding)
+
+TESTS = [{"name": "示例", "file": "tests/test_answer.py", "points": 5}]
+
+def _make_submission(root, answer, extra=""):
+    for package in ('src', 'tests'):
+        os.makedirs(root / package)
+        (root / package / '__init__.py').write_text('')
+    (root / 'src' / 'answer.py').write_text(f"def answer():\n    return {answer}\n")
+    (root / 'tests' / 'test_answer.py').write_text(
+        "from src.answer import answer\n\n"
+        "def test_answer():\n    assert answer() == 42\n\n"
+        "def test_type():\n    assert isinstance(answer(), int)\n" + extra)
+    return root
+
+def test_grade_submissions_isolated(tmp_path):
+    """测试不同提交互不影响，并记录每个用例的耗时"""
+    good = _make_submission(tmp_path / 'good', 42)
+    bad = _make_submission(tmp_path / 'bad', 41)
+    graded = parallel_autograding.grade_submissions([good, bad, good], tests=TESTS, max_workers=1)
+    score_good, durations_good = graded[str(good)]
+    score_bad, durations_bad = graded[str(bad)]
+    assert score_bad['score'] == 0 and score_bad['max_score'] == 5
+    assert score_good['score'] == 5 and len(graded) == 2, "重复的提交目录只评分一次"
+    outcomes = {case['nodeid']: case['outcome'] for case in durations_bad['tests'][0]['cases']}
+    assert outcomes == {'tests/test_answer.py::test_answer': 'failed', 'tests/test_answer.py::test_type': 'passed'}
+    assert 'log' in durations_bad['tests'][0]
+    assert all(case['duration'] >= 0 for case in durations_good['tests'][0]['cases'])
+
+def test_module_state_not_shared(tmp_path):
+    """测试前一个提交修改的模块状态不会带入下一个提交"""
+    leak = _make_submission(tmp_path / 'leak', 42,
+                            "\ndef test_leak():\n    import json\n    json.leaked = True\n")
+    check = _make_submission(tmp_path / 'check', 42,
+                             "\ndef test_clean():\n    import json\n    assert not hasattr(json, 'leaked')\n")
+    graded = parallel_autograding.grade_submissions([leak, check], tests=TESTS, max_workers=1)
+    assert graded[str(check)][0]['score'] == 5
+
+def test_crash_and_timeout(tmp_path):
+    """测试崩溃或超时的提交只记为失败，不影响其他提交，且仍写出报告"""
+    good = _make_submission(tmp_path / 'good', 42)
+    crash = _make_submission(tmp_path / 'crash', 42, "\ndef test_crash():\n    import os\n    os._exit(3)\n")
+    hang = _make_submission(tmp_path / 'hang', 42, "\ndef test_hang():\n    import time\n    time.sleep(600)\n")
+    graded = parallel_autograding.grade_submissions([crash, hang, good], tests=TESTS, max_workers=2, timeout=10)
+    assert graded[str(good)][0]['score'] == 5
+    for submission, reason in ((crash, "退出码 3"), (hang, "时限")):
+        score_data, durations = graded[str(submission)]
+        assert score_data['score'] == 0 and score_data['tests'][0]['status'] == '失败'
+        assert reason in durations['tests'][0]['log']
+    assert graded[str(hang)][1]['tests'][0]['duration'] < 60
+
+    out = tmp_path / 'out'
+    exit_code = parallel_autograding.main([str(crash), str(good), '--output-dir', str(out), '--timeout', '10'])
+    assert exit_code == 1
+    for name in ('crash', 'good'):
+        assert (out / name / 'score.json').exists() and (out / name / 'test_durations.json').exists()
+
+def test_write_reports(tmp_path):
+    """测试报告文件的写入"""
+    score_data = {'score': 5, 'max_score': 5, 'tests': [{'name': '示例', 'status': '通过', 'points': 5, 'max_points': 5}]}
+    durations = {'tests': [{'name': '示例', 'file': 'tests/test_answer.py', 'passed': True, 'duration': 0.5, 'cases': []}]}
+    parallel_autograding.write_reports(score_data, durations, tmp_path)
+    with open(tmp_path / 'score.json') as f:
+        assert json.load(f) == score_data
+    assert (tmp_path / 'test_durations.json').exists()
+    assert "5/5" in (tmp_path / 'score_summary.md').read_text()
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,69 @@
+"""
+测试二维参数相图扫描
+"""
+
+import os
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from src.map_engine import LOGISTIC, GAUSS
+from src.phase_diagram import sweep_phase_diagram, sweep_status, compute_tile, plot_phase_diagram
+
+def test_sweep_matches_direct_computation(tmp_path):
+    """测试分块结果与直接计算一致"""
+    out = str(tmp_path / "lyap.npy")
+    result = sweep_phase_diagram(out, (2.8, 4.0), (0.1, 0.9), shape=(10, 12), tile=4,
+                                 n=200, n_discard=100, max_workers=2)
+    r = np.linspace(2.8, 4.0, 12)
+    x0 = np.linspace(0.1, 0.9, 10)
+    expected = LOGISTIC.lyapunov(r[None, :], x0[:, None], 200, 100)
+    assert result.shape == (10, 12)
+    assert np.allclose(result, expected, atol=1e-5)
+
+def test_sweep_resumes(tmp_path):
+    """测试中断后从已完成的块继续"""
+    out = str(tmp_path / "period.npy")
+    kwargs = dict(shape=(8, 8), quantity='period', tile=4, n_discard=500, max_workers=1)
+    sweep_phase_diagram(out, (2.8, 3.5), (0.2, 0.8), max_tiles=1, **kwargs)
+    assert sweep_status(out) == (1, 4)
+    result = sweep_phase_diagram(out, (2.8, 3.5), (0.2, 0.8), **kwargs)
+    assert sweep_status(out) == (4, 4)
+    assert result[0, 0] == 1, "r=2.8时应为不动点"
+    assert result[0, -1] == 4, "r=3.5时应为周期4"
+
+def test_coupling_mode():
+    """测试耦合映射：完全同步时周期与单映射相同"""
+    spec = {'map': 'logistic', 'mode': 'coupling', 'quantity': 'period', 'n': 100, 'n_discard': 1000,
+            'max_period': 8, 'tol': 1e-6, 'x0': [0.3, 0.6]}
+    values = compute_tile(spec, np.array([3.2]), np.array([0.5]))
+    assert values[0, 0] == 2
+    spec['quantity'] = 'lyapunov'
+    values = compute_tile(spec, np.array([4.0]), np.array([0.5]))
+    assert values[0, 0] > 0
+
+def test_multi_parameter_map(tmp_path):
+    """测试多参数映射（Gauss映射）通过other_params传入其余参数"""
+    out = str(tmp_path / "gauss.npy")
+    with pytest.raises(ValueError):
+        sweep_phase_diagram(out, (-1, 0), (-0.5, 0.5), shape=(4, 4), map_name='gauss')
+    assert not os.path.exists(out), "参数不全时不应创建任何文件"
+    result = sweep_phase_diagram(out, (-1, 0), (-0.5, 0.5), shape=(4, 6), tile=4, map_name='gauss',
+                                 other_params=(6.2,), n=200, n_discard=100, max_workers=1)
+    expected = GAUSS.lyapunov((np.linspace(-1, 0, 6)[None, :], 6.2), np.linspace(-0.5, 0.5, 4)[:, None], 200, 100)
+    assert np.allclose(result, expected, atol=1e-5)
+
+def test_invalid_arguments(tmp_path):
+    """测试无效参数"""
+    with pytest.raises(ValueError):
+        sweep_phase_diagram(str(tmp_path / "a.npy"), (3, 4), (0, 1), mode='bad')
+    with pytest.raises(ValueError):
+        sweep_phase_diagram(str(tmp_path / "a.npy"), (3, 4), (0, 1), quantity='bad')
+
+def test_plot_phase_diagram():
+    """测试绘图函数"""
+    fig = plot_phase_diagram(np.zeros((4, 4)), (3, 4), (0, 1))
+    assert fig.get_axes()[0].get_xlabel() == 'r'
+    plt.close(fig)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
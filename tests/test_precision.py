@@ -0,0 +1,44 @@
+"""
+测试float32计算路径与精度报告
+"""
+
+import numpy as np
+import pytest
+from src.logistic_map_student import iterate_logistic
+from src.bacteria_model_student import BacteriaModel
+from src.hiv_model_student import HIVModel
+from src.millikan_fit_student import calculate_parameters
+from src.precision_report import precision_report, default_workloads, format_report
+
+def test_dtype_option():
+    """测试各计算路径的dtype选项"""
+    assert iterate_logistic(3.2, 0.5, 10, dtype=np.float32).dtype == np.float32
+    t = np.linspace(0, 10, 5)
+    assert BacteriaModel(1.0, 2.0, dtype=np.float32).w_model(t).dtype == np.float32
+    assert BacteriaModel(1.0, 2.0, dtype=np.float32).v_model(t).dtype == np.float32
+    assert HIVModel(1000, 0.5, 500, 0.1, dtype=np.float32).viral_load(t).dtype == np.float32
+    x = iterate_logistic(2.0, 0.5, 100, dtype=np.float32)
+    assert abs(x[-1] - 0.5) < 1e-6
+
+def test_calculate_parameters_float32_accumulates_in_float64():
+    """测试float32数据的矩在float64中累加"""
+    rng = np.random.default_rng(0)
+    x = rng.uniform(5e14, 1.2e15, 100000)
+    y = 4.1e-15 * x - 1.7
+    m64, c64 = calculate_parameters(x, y)[:2]
+    m32, c32, Ex, Ey, Exx, Exy = calculate_parameters(x, y, dtype=np.float32)
+    assert isinstance(Exx, float)
+    assert abs(m32 - m64) / m64 < 1e-5
+    assert abs(c32 - c64) < 1e-3
+
+def test_precision_report():
+    """测试精度报告"""
+    rows = {row['workload']: row for row in precision_report(workloads=default_workloads(size=0.2))}
+    assert rows['logistic_periodic(r=3.2)']['recommended']
+    assert rows['logistic_chaotic(r=3.9)']['diverged_at'] is not None, "混沌轨道在float32下应发散"
+    assert rows['w_model_grid']['memory_ratio'] == 0.5
+    assert 'pixel_mismatch' in rows['bifurcation']
+    assert format_report(list(rows.values())).count("\n") == len(rows) + 1
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
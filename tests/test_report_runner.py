@@ -0,0 +1,88 @@
+"""
+测试批量报告任务图
+"""
+
+import json
+import os
+import pytest
+from src.report_runner import Task, TaskGraphError, run_graph, task_key, default_tasks, TIMING_FILE
+
+def write_value(output_dir, name, value):
+    path = os.path.join(output_dir, f"{name}.txt")
+    with open(path, "w") as f:
+        f.write(str(value))
+    return {"outputs": [path], "value": value}
+
+def add_values(output_dir, dep_results):
+    total = sum(result["value"] for result in dep_results.values())
+    return write_value(output_dir, "total", total)
+
+def fail(output_dir):
+    raise RuntimeError("boom")
+
+def _graph(a=1):
+    return [
+        Task("a", write_value, {"name": "a", "value": a}),
+        Task("b", write_value, {"name": "b", "value": 2}),
+        Task("total", add_values, deps=["a", "b"]),
+    ]
+
+def test_run_graph_and_cache(tmp_path):
+    """测试依赖结果传递、缓存跳过以及参数变化后重新运行"""
+    out = str(tmp_path)
+    timings = run_graph(_graph(), out, max_workers=2)
+    assert all(t["status"] == "ran" for t in timings.values())
+    assert open(os.path.join(out, "total.txt")).read() == "3"
+
+    timings = run_graph(_graph(), out, max_workers=2)
+    assert all(t["status"] == "cached" for t in timings.values()), "未改变的任务应被跳过"
+
+    timings = run_graph(_graph(a=5), out, max_workers=2)
+    assert timings["a"]["status"] == "ran"
+    assert timings["b"]["status"] == "cached"
+    assert timings["total"]["status"] == "ran", "依赖改变后下游任务应重新运行"
+    assert open(os.path.join(out, "total.txt")).read() == "7"
+
+    with open(os.path.join(out, TIMING_FILE)) as f:
+        summary = json.load(f)
+    assert set(summary["tasks"]) == {"a", "b", "total"}
+
+def test_failed_task_is_recorded(tmp_path):
+    """测试任务失败时记录错误、跳过下游任务，并仍写入缓存和耗时"""
+    out = str(tmp_path)
+    graph = [
+        Task("ok", write_value, {"name": "ok", "value": 1}),
+        Task("bad", fail),
+        Task("after_bad", add_values, deps=["bad"]),
+    ]
+    with pytest.raises(TaskGraphError) as info:
+        run_graph(graph, out, max_workers=2)
+    assert info.value.failed == ["bad"]
+    with open(os.path.join(out, TIMING_FILE)) as f:
+        tasks = json.load(f)["tasks"]
+    assert tasks["bad"]["status"] == "failed" and "boom" in tasks["bad"]["error"]
+    assert tasks["after_bad"]["status"] == "skipped"
+    with pytest.raises(TaskGraphError) as info:
+        run_graph(graph, out, max_workers=2)
+    assert info.value.timings["ok"]["status"] == "cached", "成功的任务不应因其他任务失败而重跑"
+
+def test_key_includes_code_fingerprint():
+    """测试代码改变时缓存键随之改变"""
+    task = Task("a", write_value, {"name": "a", "value": 1})
+    assert task_key(task, {}, code="v1") != task_key(task, {}, code="v2")
+    assert task_key(task, {}) == task_key(task, {})
+
+def test_invalid_graph(tmp_path):
+    """测试未知依赖和循环依赖"""
+    with pytest.raises(ValueError):
+        run_graph([Task("a", write_value, deps=["missing"])], str(tmp_path))
+    with pytest.raises(ValueError):
+        run_graph([Task("a", write_value, deps=["b"]), Task("b", write_value, deps=["a"])], str(tmp_path))
+
+def test_default_tasks():
+    """测试默认报告包含全部分析"""
+    names = {task.name for task in default_tasks()}
+    assert {"logistic_bifurcation", "bacteria_v_fit_A", "hiv_fit", "millikan_fit", "summary"} <= names
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,104 @@
+"""
+测试参数扫描服务
+"""
+
+import asyncio
+import json
+import time
+import numpy as np
+import pytest
+from src.bacteria_model_student import BacteriaModel
+from src.hiv_model_student import HIVModel
+from src.scan_server import ParameterLattice, ScanService, build_service, start_server
+
+T = np.linspace(0, 10, 50)
+
+def test_lattice_points_are_exact():
+    """测试格点上的插值等于模型精确值"""
+    lattice = ParameterLattice('bacteria_w', {'A': (1.0, 2.0, 3), 'tau': (1.0, 3.0, 5)}, T)
+    u = lattice.position({'A': 1.5, 'tau': 2.5})
+    assert np.allclose(lattice.interpolate(u), BacteriaModel(1.5, 2.5).w_model(T))
+
+def test_interpolation_between_points():
+    """测试格点之间的插值接近精确值"""
+    service = build_service(T, {'hiv': {'A': (0, 2e5, 9), 'alpha': (0, 2, 41), 'B': (0, 1e3, 3), 'beta': (0, 1, 3)}})
+    curve = service.curve('hiv', A=1.23e5, alpha=0.61, B=0, beta=0)
+    exact = HIVModel(1.23e5, 0.61, 0, 0).viral_load(T)
+    assert np.max(np.abs(curve - exact)) / exact[0] < 0.01
+
+def test_cache_hits_and_eviction():
+    """测试量化后的缓存命中与LRU淘汰"""
+    lattice = ParameterLattice('bacteria_v', {'tau': (0.5, 5, 10)}, T)
+    service = ScanService({'bacteria_v': lattice}, levels=4, cache_size=2)
+    service.lookup('bacteria_v', {'A': 1, 'tau': 1.0})
+    service.lookup('bacteria_v', {'A': 1, 'tau': 1.01})
+    assert (service.hits, service.misses) == (1, 1), "同一量化格的请求应命中缓存"
+    service.lookup('bacteria_v', {'A': 1, 'tau': 2.0})
+    service.lookup('bacteria_v', {'A': 1, 'tau': 3.0})
+    service.lookup('bacteria_v', {'A': 1, 'tau': 1.0})
+    assert service.misses == 4, "最久未用的条目应被淘汰"
+    with pytest.raises(ValueError):
+        service.lookup('bacteria_v', {'A': 1})
+    for bad in ('nan', 'inf', 'x'):
+        with pytest.raises(ValueError):
+            service.lookup('bacteria_v', {'tau': bad})
+    with pytest.raises(ValueError):
+        service.lookup('unknown', {})
+
+def test_default_lattice_accuracy():
+    """测试默认格点配置的插值误差（相对曲线峰值）小于1%"""
+    t = np.linspace(0, 10, 100)
+    service = build_service(t)
+    rng = np.random.default_rng(0)
+    cases = [('hiv', {'A': 1.5e5, 'alpha': 0.05, 'B': 2e4, 'beta': 1.3}),
+             ('bacteria_w', {'A': 1.0, 'tau': 0.15}),
+             ('bacteria_v', {'tau': 0.13})]
+    for _ in range(50):
+        A, B, alpha, beta, tau = rng.uniform([0, 0, 0, 0, 0.1], [3e5, 3e5, 2, 2, 5])
+        cases += [('hiv', {'A': A, 'alpha': alpha, 'B': B, 'beta': beta}),
+                  ('bacteria_w', {'A': rng.uniform(0.1, 3), 'tau': tau}), ('bacteria_v', {'tau': tau})]
+    for model, p in cases:
+        if model == 'hiv':
+            exact = HIVModel(p['A'], p['alpha'], p['B'], p['beta']).viral_load(t)
+        elif model == 'bacteria_w':
+            exact = BacteriaModel(p['A'], p['tau']).w_model(t)
+        else:
+            exact = BacteriaModel(1.0, p['tau']).v_model(t)
+        error = np.max(np.abs(service.curve(model, **p) - exact)) / np.max(np.abs(exact))
+        assert error < 0.01, f"{model} {p}: 误差为峰值的 {error:.1%}"
+
+def test_http_interface():
+    """测试本地HTTP接口与缓存响应延迟"""
+    service = build_service(T, {'bacteria_w': {'A': (0.5, 2, 4), 'tau': (0.5, 3, 6)}})
+
+    async def scenario():
+        server = await start_server(service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for target in ('/curve?model=bacteria_w&A=1&tau=2', '/curve?model=bacteria_w&A=1',
+                       '/curve?model=bacteria_w&A=1&tau=nan', '/nothing'):
+            writer.write(f"GET {target} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while (line := await reader.readline()) != b'\r\n':
+                if line.lower().startswith(b'content-length'):
+                    length = int(line.split(b':')[1])
+            responses.append((status, json.loads(await reader.readexactly(length))))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert [status for status, _ in responses] == [200, 400, 400, 404]
+    assert np.allclose(responses[0][1]['y'], BacteriaModel(1, 2).w_model(T), rtol=1e-2, atol=1e-3)
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        service.lookup('bacteria_w', {'A': 1, 'tau': 2})
+    assert (time.perf_counter() - start) / 1000 < 1e-3, "缓存命中应远小于1毫秒"
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])